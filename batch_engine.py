@@ -0,0 +1,558 @@
+"""Vectorized engine that advances many games in lockstep with NumPy.
+
+``simulate_batch`` follows the same rules as ``main.simulate_game`` but keeps
+the state of every game in arrays and runs each phase of a turn as masked
+array operations over all games at once. Arrays are laid out with the game
+axis last (``hp[seat, game]``, ``hand[seat, card, game]``), so the per-seat
+and per-card slices used by every phase are contiguous vectors. Finished
+games are masked out and the arrays are compacted once half of the columns
+are finished, so the cost of a round stays close to proportional to the
+games still running.
+"""
+import numpy as np
+
+from utils import CARD_IDS, CARD_NAMES, CHARACTERS, DECK_COUNTS, WEAPON_RANGES
+
+ROLE_NAMES = ("Sheriff", "Deputy", "Outlaw", "Renegade")
+SHERIFF, DEPUTY, OUTLAW, RENEGADE = range(len(ROLE_NAMES))
+
+WINNER_NAMES = ("Sheriff", "Outlaws", "Renegade", "Draw")
+WIN_SHERIFF, WIN_OUTLAWS, WIN_RENEGADE, WIN_DRAW = range(len(WINNER_NAMES))
+
+BANG = CARD_IDS["BANG"]
+MISSED = CARD_IDS["MISSED"]
+BEER = CARD_IDS["BEER"]
+MUSTANG = CARD_IDS["MUSTANG"]
+SCOPE = CARD_IDS["SCOPE"]
+VOLCANIC = CARD_IDS["VOLCANIC"]
+WEAPON_IDS = sorted(CARD_IDS[w] for w in WEAPON_RANGES)
+EQUIPMENT_IDS = sorted(WEAPON_IDS + [MUSTANG, SCOPE])
+
+_CHAR_INDEX = {name: i for i, name in enumerate(CHARACTERS)}
+# Personagens cujas habilidades estao implementadas neste motor.
+SUPPORTED_CHARACTERS = frozenset({
+    "Bart Cassidy", "Calamity Janet", "Jesse Jones", "Lucky Duke",
+    "Paul Regret", "Sid Ketchum", "Slab the Killer", "Suzy Lafayette",
+    "Willy the Kid", "El Gringo", "Pedro Ramirez", "Kit Carlson",
+    "Rose Doolan", "Black Jack",
+})
+_PERK_MASKS = {
+    "janet": "Calamity Janet",
+    "willy": "Willy the Kid",
+    "slab": "Slab the Killer",
+    "bart": "Bart Cassidy",
+    "gringo": "El Gringo",
+    "sid": "Sid Ketchum",
+    "suzy": "Suzy Lafayette",
+    "jesse": "Jesse Jones",
+    "lucky": "Lucky Duke",
+    "pedro": "Pedro Ramirez",
+    "kit": "Kit Carlson",
+    "black_jack": "Black Jack",
+}
+
+
+def _role_layout(players_count):
+    from main import ROLE_DISTRIBUTION
+
+    if players_count not in ROLE_DISTRIBUTION:
+        raise ValueError("Numero de jogadores deve estar entre 3 e 7.")
+    layout = []
+    for role, count in ROLE_DISTRIBUTION[players_count].items():
+        layout.extend([ROLE_NAMES.index(role)] * count)
+    return np.array(layout, dtype=np.int8)
+
+
+def _sample_counts(counts, rng):
+    """Pick one row of ``counts`` (cards x games) per game, weighted by count.
+
+    Games without any card return ``-1``.
+    """
+    cum = counts.cumsum(axis=0)
+    u = rng.random(counts.shape[1]) * cum[-1]
+    cards = (cum <= u).sum(axis=0)
+    cards[cum[-1] == 0] = -1
+    return cards
+
+
+def _pick_seat(mask, rng):
+    """Pick a random ``True`` seat of ``mask`` (seats x games), ``-1`` if none."""
+    scores = rng.random(mask.shape)
+    scores[~mask] = -1.0
+    picked = scores.argmax(axis=0)
+    picked[~mask.any(axis=0)] = -1
+    return picked
+
+
+class _Batch:
+    """State of many simultaneous games; column ``i`` is game ``self.index[i]``."""
+
+    _GAME_ARRAYS = (
+        "index", "roles", "chars", "hp", "max_hp", "alive", "hand", "hand_size",
+        "weapon_range", "volcanic", "range_bonus", "dodge_bonus", "deck",
+        "deck_len", "discard", "top_discard", "in_equilibrium", "running",
+    ) + tuple(_PERK_MASKS)
+
+    def __init__(self, players_count, games, characters, rng, legacy_victory=False):
+        self.rng = rng
+        self.legacy_victory = legacy_victory
+        self.round_number = 0
+        self.P = P = players_count
+        G = games
+        C = len(CARD_NAMES)
+
+        self.index = np.arange(G)
+        layout = _role_layout(players_count)
+        self.roles = rng.permuted(np.tile(layout[:, None], (1, G)), axis=0)
+        if characters is None:
+            order = rng.random((len(CHARACTERS), G)).argsort(axis=0)
+            self.chars = order[:P].astype(np.int16)
+        else:
+            if len(characters) != P:
+                raise ValueError("Quantidade de personagens diferente do numero de jogadores.")
+            for c in characters:
+                if c not in _CHAR_INDEX:
+                    raise ValueError(f"Personagem invalido: {c}")
+            self.chars = np.tile(np.array([_CHAR_INDEX[c] for c in characters], dtype=np.int16)[:, None], (1, G))
+        unsupported = {CHARACTERS[c] for c in np.unique(self.chars)} - SUPPORTED_CHARACTERS
+        if unsupported:
+            raise ValueError(f"Personagens sem suporte no motor vetorizado: {sorted(unsupported)}")
+
+        self.hp = np.where(self.roles == SHERIFF, 5, 4).astype(np.int16)
+        self.max_hp = self.hp.copy()
+        self.alive = np.ones((P, G), dtype=bool)
+        self.hand = np.zeros((P, C, G), dtype=np.int16)
+        self.hand_size = np.zeros((P, G), dtype=np.int16)
+        self.weapon_range = np.ones((P, G), dtype=np.int16)
+        self.volcanic = np.zeros((P, G), dtype=bool)
+        self.range_bonus = np.zeros((P, G), dtype=np.int16)
+        self.dodge_bonus = np.zeros((P, G), dtype=np.int16)
+
+        for name, character in _PERK_MASKS.items():
+            setattr(self, name, self.chars == _CHAR_INDEX[character])
+        self.dodge_bonus += self.chars == _CHAR_INDEX["Paul Regret"]
+        self.range_bonus += self.chars == _CHAR_INDEX["Rose Doolan"]
+
+        # Baralho: uma permutacao por partida, comprada do fim para o inicio
+        # como ``list.pop``. O descarte e guardado como contagem por carta.
+        counts = np.array(list(DECK_COUNTS.values()), dtype=np.int16)
+        self.template = np.repeat(np.arange(C, dtype=np.int16), counts)
+        self.template_rank = np.concatenate([np.arange(n) for n in counts])
+        self.deck = np.zeros((len(self.template), G), dtype=np.int16)
+        self.deck_len = np.zeros(G, dtype=np.int16)
+        self.discard = np.tile(counts[:, None], (1, G))
+        self.top_discard = np.full(G, -1, dtype=np.int16)
+        self.reshuffle(np.arange(G))
+
+        self.in_equilibrium = np.zeros(G, dtype=bool)
+        self.running = np.ones(G, dtype=bool)
+        self.result = {
+            "winner": np.full(G, WIN_DRAW, dtype=np.int8),
+            "rounds": np.zeros(G, dtype=np.int32),
+            "equilibrium_round": np.zeros(G, dtype=np.int32),
+            "break_round": np.zeros(G, dtype=np.int32),
+            "characters": self.chars.T,
+            "roles": self.roles.T,
+            "alive": np.zeros((G, P), dtype=bool),
+        }
+
+    def compact(self, keep):
+        for name in self._GAME_ARRAYS:
+            setattr(self, name, np.ascontiguousarray(getattr(self, name)[..., keep]))
+
+    # -- cards ---------------------------------------------------------------
+    def reshuffle(self, g):
+        """Shuffle the discard of games ``g`` into a new draw pile."""
+        valid = self.template_rank < self.discard[:, g][self.template].T
+        keys = self.rng.random(valid.shape)
+        keys[~valid] = 2.0
+        self.deck[:, g] = self.template[keys.argsort(axis=1)].T
+        self.deck_len[g] = valid.sum(axis=1)
+        self.discard[:, g] = 0
+        self.top_discard[g] = -1
+
+    def draw(self, g, refill=True):
+        """Pop one card for each game in ``g``; ``-1`` when nothing is left."""
+        length = self.deck_len[g]
+        if refill:
+            empty = length == 0
+            if empty.any():
+                self.reshuffle(g[empty])
+                length = self.deck_len[g]
+        has = length > 0
+        cards = self.deck[np.maximum(length - 1, 0), g].astype(np.intp)
+        cards[~has] = -1
+        self.deck_len[g] = length - has
+        return cards
+
+    # Cada partida aparece uma unica vez em ``g``: os indices avancados nao se
+    # repetem e ``+=`` e seguro (sem ``np.add.at``).
+    def give(self, g, seat, cards):
+        ok = cards >= 0
+        g, cards = g[ok], cards[ok]
+        if isinstance(seat, np.ndarray):
+            seat = seat[ok]
+        self.hand[seat, cards, g] += 1
+        self.hand_size[seat, g] += 1
+
+    def take(self, g, seat, cards):
+        ok = cards >= 0
+        g, cards = g[ok], cards[ok]
+        if isinstance(seat, np.ndarray):
+            seat = seat[ok]
+        self.hand[seat, cards, g] -= 1
+        self.hand_size[seat, g] -= 1
+
+    def throw(self, g, cards):
+        ok = cards >= 0
+        g, cards = g[ok], cards[ok]
+        self.discard[cards, g] += 1
+        self.top_discard[g] = cards
+
+    def draw_to(self, g, seat):
+        self.give(g, seat, self.draw(g))
+
+    def discard_highest(self, g, s, amount):
+        """Discard ``amount`` cards per game, highest ids first.
+
+        ``Hand.pop`` drops the most recently drawn card; the count arrays keep
+        no card order, so this engine uses the card ids instead.
+        """
+        hand = self.hand[s][:, g]
+        amount = amount.astype(np.int16)
+        top = self.top_discard[g]
+        for card in range(hand.shape[0] - 1, -1, -1):
+            k = np.minimum(hand[card], amount)
+            if not k.any():
+                continue
+            hand[card] -= k
+            amount -= k
+            self.discard[card, g] += k
+            top = np.where(k > 0, card, top)
+        self.hand[s][:, g] = hand
+        self.hand_size[s, g] = hand.sum(axis=0)
+        self.top_discard[g] = top
+
+    def steal_random(self, g, thief, victim):
+        if isinstance(victim, np.ndarray):
+            counts = self.hand[victim, :, g].T
+        else:
+            counts = self.hand[victim][:, g]
+        cards = _sample_counts(counts, self.rng)
+        self.take(g, victim, cards)
+        self.give(g, thief, cards)
+
+    # -- turn phases ---------------------------------------------------------
+    def turn_start(self, g, s):
+        # Sid Ketchum descarta duas cartas para recuperar 1 de vida.
+        g = g[self.sid[s, g]]
+        while len(g):
+            g = g[(self.hp[s, g] < self.max_hp[s, g]) & (self.hand_size[s, g] >= 2)]
+            if len(g):
+                self.discard_highest(g, s, np.full(len(g), 2))
+                self.hp[s, g] += 1
+
+    def draw_phase(self, g, s):
+        rng = self.rng
+        special = np.zeros(len(g), dtype=bool)
+        one_card = np.zeros(len(g), dtype=bool)
+
+        jesse = self.jesse[s, g]
+        if jesse.any():
+            gj = g[jesse]
+            others = self.alive[:, gj] & (self.hand_size[:, gj] > 0)
+            others[s] = False
+            victim = _pick_seat(others, rng)
+            ok = victim >= 0
+            self.steal_random(gj[ok], s, victim[ok])
+            one_card[np.flatnonzero(jesse)[ok]] = True
+
+        pedro = self.pedro[s, g]
+        if pedro.any():
+            pos = np.flatnonzero(pedro)
+            pos = pos[self.discard[:, g[pos]].any(axis=0)]
+            if len(pos):
+                gp = g[pos]
+                cards = self.top_discard[gp].astype(np.intp)
+                unknown = cards < 0
+                if unknown.any():
+                    cards[unknown] = _sample_counts(self.discard[:, gp[unknown]], rng)
+                self.discard[cards, gp] -= 1
+                self.top_discard[gp] = -1
+                self.give(gp, s, cards)
+                one_card[pos] = True
+
+        kit = self.kit[s, g]
+        if kit.any():
+            gk = g[kit]
+            cards = np.stack([self.draw(gk, refill=False) for _ in range(3)])
+            keys = rng.random(cards.shape)
+            keys[cards < 0] = 2.0
+            ranked = np.take_along_axis(cards, keys.argsort(axis=0), axis=0)
+            self.give(gk, s, ranked[0])
+            self.give(gk, s, ranked[1])
+            back = ranked[2] >= 0
+            gb = gk[back]
+            self.deck[self.deck_len[gb], gb] = ranked[2][back]
+            self.deck_len[gb] += 1
+            special |= kit
+
+        black_jack = self.black_jack[s, g]
+        if black_jack.any():
+            gb = g[black_jack]
+            self.draw_to(gb, s)
+            self.draw_to(gb, s)
+            self.draw_to(gb[rng.random(len(gb)) < 0.5], s)
+            special |= black_jack
+
+        lucky = self.lucky[s, g]
+        if lucky.any():
+            gl = g[lucky]
+            for draws in (gl, gl[~one_card[lucky]]):
+                first = self.draw(draws)
+                second = self.draw(draws)
+                keep_second = (second >= 0) & (rng.random(len(draws)) < 0.5)
+                self.give(draws, s, np.where(keep_second, second, first))
+                self.throw(draws, np.where(keep_second, first, second))
+            special |= lucky
+
+        normal = ~special
+        self.draw_to(g[normal], s)
+        self.draw_to(g[normal & ~one_card], s)
+
+    def equip(self, g, s):
+        hand = self.hand[s]
+        gear = hand[EQUIPMENT_IDS][:, g]
+        held = gear.any(axis=0)
+        if not held.any():
+            return
+        g, gear = g[held], gear[:, held]
+        best = np.full(len(g), -1)
+        top = self.top_discard[g]
+        for row, card in enumerate(EQUIPMENT_IDS):
+            count = gear[row]
+            present = count > 0
+            if not present.any():
+                continue
+            if card == MUSTANG:
+                self.dodge_bonus[s, g] += count
+            elif card == SCOPE:
+                self.range_bonus[s, g] += count
+            else:
+                best[present] = card
+            self.discard[card, g] += count
+            hand[card, g] = 0
+            top = np.where(present, card, top)
+        self.hand_size[s, g] -= gear.sum(axis=0)
+        # O ultimo equipamento processado (maior id) fica no topo do descarte.
+        self.top_discard[g] = top
+        armed = best >= 0
+        for card in WEAPON_IDS:
+            chosen = g[best == card]
+            self.weapon_range[s, chosen] = WEAPON_RANGES[CARD_NAMES[card]]["range"]
+            self.volcanic[s, chosen] = card == VOLCANIC
+
+    def beer(self, g, s):
+        gb = g[(self.hp[s, g] <= 2) & (self.hand[s, BEER, g] > 0)]
+        self.hp[s, gb] += 1
+        self.hand[s, BEER, gb] -= 1
+        self.hand_size[s, gb] -= 1
+        self.discard[BEER, gb] += 1
+        self.top_discard[gb] = BEER
+
+    def targets(self, g, s):
+        """Candidate mask ``(P, len(g))`` following ``targeting.select_target``."""
+        alive = self.alive[:, g]
+        total_range = self.weapon_range[s, g] + self.range_bonus[s, g]
+        # Distancia em assentos contando apenas os jogadores vivos.
+        seat = np.cumsum(alive, axis=0, dtype=np.int16)
+        steps = np.abs(seat - seat[s])
+        distance = np.minimum(steps, seat[-1] - steps)
+        in_range = alive & (distance + self.dodge_bonus[:, g] <= total_range)
+        in_range[s] = False
+
+        roles = self.roles[:, g]
+        shooter = roles[s]
+        law = roles <= DEPUTY
+        mask = in_range
+
+        sheriff = shooter == SHERIFF
+        if sheriff.any():
+            mask = mask & ~(law & sheriff)
+
+        prefer_role = np.full(len(g), -1, dtype=np.int8)
+        prefer_role[shooter == OUTLAW] = SHERIFF
+        renegade = shooter == RENEGADE
+        if renegade.any():
+            outlaws_alive = (alive[:, renegade] & (roles[:, renegade] == OUTLAW)).sum(axis=0)
+            law_alive = (alive[:, renegade] & law[:, renegade]).sum(axis=0)
+            prefer_role[renegade] = np.where(outlaws_alive > law_alive, OUTLAW, SHERIFF)
+        prefer = in_range & (roles == prefer_role)
+        use = prefer.any(axis=0)
+        if use.any():
+            mask = np.where(use, prefer, mask)
+        return mask
+
+    def attack(self, g, s):
+        # Indices planos (``seat * G + game``) evitam a indexacao avancada com
+        # varios arrays, que e bem mais lenta em arrays de tres dimensoes.
+        C, G = self.hand.shape[1:]
+        hand = self.hand.reshape(-1)
+        hand_size = self.hand_size.reshape(-1)
+        own_bang = (s * C + BANG) * G
+        own_missed = (s * C + MISSED) * G
+        janet = self.janet.reshape(-1)
+
+        shots = np.where(self.volcanic[s, g], 2, 1)
+        willy = self.willy[s, g]
+        if willy.any():
+            gw = g[willy]
+            shots[willy] = hand[own_bang + gw] + np.where(janet[s * G + gw], hand[own_missed + gw], 0)
+        while len(g):
+            has_bang = hand[own_bang + g] > 0
+            can_shoot = (shots > 0) & (has_bang | (janet[s * G + g] & (hand[own_missed + g] > 0)))
+            g, shots, has_bang = g[can_shoot], shots[can_shoot] - 1, has_bang[can_shoot]
+            if not len(g):
+                return
+
+            target = _pick_seat(self.targets(g, s), self.rng)
+            hit = target >= 0
+            gs, target = g[hit], target[hit]
+            use = np.where(has_bang[hit], BANG, MISSED)
+            hand[(s * C + use) * G + gs] -= 1
+            hand_size[s * G + gs] -= 1
+            self.throw(gs, use)
+
+            seat = target * G + gs
+            target_missed = (target * C + MISSED) * G + gs
+            target_bang = (target * C + BANG) * G + gs
+            needed = np.where(self.slab[s, gs], 2, 1)
+            missed = np.minimum(hand[target_missed], needed)
+            bangs = np.where(janet[seat], np.minimum(hand[target_bang], needed - missed), 0)
+            hand[target_missed] -= missed
+            hand[target_bang] -= bangs
+            hand_size[seat] -= missed + bangs
+            self.discard[MISSED, gs] += missed
+            self.discard[BANG, gs] += bangs
+            self.top_discard[gs[missed > 0]] = MISSED
+            self.top_discard[gs[bangs > 0]] = BANG
+
+            damaged = missed + bangs < needed
+            gd, td, seat = gs[damaged], target[damaged], seat[damaged]
+            hp = self.hp.reshape(-1)
+            hp[seat] -= 1
+            bart = self.bart.reshape(-1)[seat]
+            if bart.any():
+                self.draw_to(gd[bart], td[bart])
+            gringo = self.gringo.reshape(-1)[seat]
+            if gringo.any():
+                self.steal_random(gd[gringo], td[gringo], s)
+            dead = hp[seat] <= 0
+            if dead.any():
+                self.alive.reshape(-1)[seat[dead]] = False
+                if not self.legacy_victory:
+                    self.finish(np.unique(gd[dead]), self.round_number)
+                    keep = self.running[g]
+                    g, shots = g[keep], shots[keep]
+
+    def hand_limit(self, g, s):
+        excess = self.hand_size[s, g] - self.hp[s, g]
+        over = excess > 0
+        if over.any():
+            self.discard_highest(g[over], s, excess[over])
+
+    def turn_end(self, g, s):
+        gs = g[self.suzy[s, g] & (self.hand_size[s, g] == 0)]
+        if len(gs):
+            self.draw_to(gs, s)
+
+    # -- game loop -----------------------------------------------------------
+    def team_counts(self):
+        alive, roles = self.alive, self.roles
+        return (
+            (alive & (roles == SHERIFF)).any(axis=0),
+            (alive & (roles == OUTLAW)).sum(axis=0),
+            (alive & (roles <= DEPUTY)).sum(axis=0),
+            (alive & (roles == RENEGADE)).any(axis=0),
+        )
+
+    def check_equilibrium(self, round_number):
+        _sheriff, outlaws, law, _renegade = self.team_counts()
+        balanced = outlaws == law
+        starts = balanced & ~self.in_equilibrium & self.running
+        breaks = ~balanced & self.in_equilibrium & self.running
+        for key, games in (("equilibrium_round", starts), ("break_round", breaks)):
+            games = self.index[games]
+            first = self.result[key][games] == 0
+            self.result[key][games[first]] = round_number
+        self.in_equilibrium = balanced
+
+    def finish(self, cols, round_number):
+        """Encerra, entre as colunas ``cols``, as partidas que ja tem vencedor."""
+        alive, roles = self.alive[:, cols], self.roles[:, cols]
+        sheriff = (alive & (roles == SHERIFF)).any(axis=0)
+        outlaws = (alive & (roles == OUTLAW)).any(axis=0)
+        renegade = (alive & (roles == RENEGADE)).any(axis=0)
+        winner = np.full(len(cols), -1, dtype=np.int8)
+        winner[~sheriff & ~outlaws & renegade] = WIN_RENEGADE
+        winner[sheriff & ~outlaws & ~renegade] = WIN_SHERIFF
+        winner[~sheriff & outlaws] = WIN_OUTLAWS
+        done = (winner >= 0) & self.running[cols]
+        if done.any():
+            cols = cols[done]
+            games = self.index[cols]
+            self.result["winner"][games] = winner[done]
+            self.result["rounds"][games] = round_number
+            self.result["alive"][games] = self.alive[:, cols].T
+            self.running[cols] = False
+
+    def check_victory(self, round_number):
+        self.finish(np.arange(len(self.index)), round_number)
+        # Copiar os arrays custa caro: so compacta quando metade das
+        # colunas ja pertence a partidas encerradas.
+        if self.running.sum() * 2 <= len(self.running):
+            self.compact(self.running)
+
+    def run(self, rounds):
+        games = np.arange(len(self.index))
+        for s in range(self.P):
+            self.draw_to(games, s)
+            self.draw_to(games, s)
+        for round_ in range(rounds):
+            if not self.running.any():
+                break
+            self.round_number = round_ + 1
+            self.check_equilibrium(round_ + 1)
+            for s in range(self.P):
+                g = np.flatnonzero(self.alive[s] & self.running)
+                if not len(g):
+                    continue
+                self.turn_start(g, s)
+                self.draw_phase(g, s)
+                self.equip(g, s)
+                self.beer(g, s)
+                self.attack(g, s)
+                self.hand_limit(g, s)
+                self.turn_end(g, s)
+            self.check_victory(round_ + 1)
+        games = self.index[self.running]
+        self.result["rounds"][games] = rounds
+        self.result["alive"][games] = self.alive[:, self.running].T
+        return self.result
+
+
+def simulate_batch(players_count=4, games=1000, characters=None, rounds=500, seed=None,
+                   legacy_victory=False):
+    """Simula ``games`` partidas de uma vez e retorna arrays com os resultados.
+
+    O dicionario retornado contem, por partida, ``winner`` (indice em
+    ``WINNER_NAMES``), ``rounds``, ``equilibrium_round``/``break_round``
+    (0 quando nao ocorreu) e, por partida e assento, ``characters`` (indice
+    em ``utils.CHARACTERS``), ``roles`` (indice em ``ROLE_NAMES``) e
+    ``alive``.
+
+    Como em ``simulate_game``, a partida termina logo apos a morte decisiva;
+    ``legacy_victory=True`` verifica a vitoria apenas no fim da rodada.
+    """
+    rng = np.random.default_rng(seed)
+    return _Batch(players_count, games, characters, rng, legacy_victory).run(rounds)
@@ -0,0 +1,27 @@
+"""Time ``simulate_game`` with immediate and end-of-round victory checks.
+
+Usage: ``python bench/bench_victory.py [players] [games]`` (defaults: 7, 2000).
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import simulate_game
+from utils import derive_seed
+
+
+def bench(players_count, games, legacy_victory):
+    start = time.perf_counter()
+    for i in range(games):
+        simulate_game(players_count, seed=derive_seed(0, i), legacy_victory=legacy_victory)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    players_count = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    for label, legacy in (("end of round", True), ("immediate", False)):
+        elapsed = bench(players_count, games, legacy)
+        print(f"{label:>13}: {games / elapsed:8.0f} games/s ({elapsed * 1000 / games:.3f} ms/game)")
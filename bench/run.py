@@ -0,0 +1,247 @@
+"""Benchmark runner for the simulation core and the service endpoints.
+
+Usage::
+
+    python bench/run.py [--quick] [--output results.json]
+    python bench/run.py --compare bench/baseline.json [--threshold 0.15]
+
+Each case reports its best time over ``--repeat`` runs, the throughput
+(games or calls per second) and its peak RSS. The RSS comes from one more,
+untimed run of the case alone in a fresh interpreter (``--measure``):
+``peak_rss_kb`` is that process and ``children_peak_rss_kb`` the largest of
+the processes it started (pool workers, cold start interpreters).
+With ``--compare`` every case slower than the stored baseline by more than
+``--threshold`` is reported as a regression and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import compute_probability_matrix, compute_statistics, simulate_game
+from state import Player
+from targeting import TargetingIndex, select_target
+from utils import build_deck, derive_seed, draw_card
+
+
+def _peak_rss_kb(who):
+    if who == resource.RUSAGE_SELF:
+        # On Linux ru_maxrss survives exec and would carry the parent's
+        # peak; VmHWM only covers this process.
+        try:
+            with open("/proc/self/status") as fh:
+                for line in fh:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+    peak = resource.getrusage(who).ru_maxrss
+    # macOS reports bytes, Linux kilobytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure_rss(name, quick=False):
+    """Run case ``name`` once in a fresh interpreter and return its peak RSS fields."""
+    argv = [sys.executable, os.path.abspath(__file__), "--measure", name]
+    if quick:
+        argv.append("--quick")
+    out = subprocess.run(argv, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def _games(players_count, games, return_log):
+    def run():
+        for i in range(games):
+            simulate_game(players_count, seed=derive_seed(0, i), return_log=return_log)
+    return run
+
+
+def _matrix(games_per_combo):
+    def run():
+        compute_probability_matrix(4, games_per_combo=games_per_combo, seed=0)
+    return run
+
+
+def _statistics(games):
+    def run():
+        compute_statistics(4, games=games, seed=0)
+    return run
+
+
+def _select_target(calls):
+    roles = ["Sheriff", "Outlaw", "Outlaw", "Renegade", "Deputy", "Outlaw", "Renegade"]
+    players = [Player(i, role, "Bart Cassidy", 4) for i, role in enumerate(roles)]
+    index = TargetingIndex(players)
+    rng = random.Random(0)
+
+    def run():
+        for i in range(calls):
+            select_target(players[i % len(players)], players, rng, index=index)
+    return run
+
+
+def _draw_card(calls):
+    rng = random.Random(0)
+
+    def run():
+        deck = build_deck(rng)
+        discard = deck.discards
+        for _ in range(calls):
+            discard.append(draw_card(deck, discard, rng))
+    return run
+
+
+def _cold_start(argv, runs):
+    """Start a fresh interpreter ``runs`` times, like a CLI call or a spawned worker."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run():
+        for _ in range(runs):
+            subprocess.run([sys.executable, *argv], cwd=root, check=True, stdout=subprocess.DEVNULL)
+    return run
+
+
+def _endpoint(client, url, requests):
+    import service
+
+    def run():
+        for _ in range(requests):
+            # Seeded URLs would otherwise be answered from the caches.
+            main.MATRIX_CACHE.clear()
+            service.RESPONSE_CACHE.clear()
+            response = client.get(url)
+            assert response.status_code == 200, url
+    return run
+
+
+def build_cases(quick=False):
+    """Return ``[(name, function, units, unit_name)]`` for every benchmark."""
+    from service import app
+
+    games = 100 if quick else 500
+    calls = 20000 if quick else 100000
+    client = app.test_client()
+    cases = []
+    for players_count in range(3, 8):
+        for return_log in (False, True):
+            name = f"simulate_game[{players_count}p{',log' if return_log else ''}]"
+            cases.append((name, _games(players_count, games, return_log), games, "games"))
+    for games_per_combo in ((5, 25) if quick else (10, 50, 100)):
+        combos = 42  # 14 personagens x 3 funcoes validas com 4 jogadores
+        cases.append((
+            f"compute_probability_matrix[{games_per_combo}]", _matrix(games_per_combo),
+            games_per_combo * combos, "games",
+        ))
+    cases.append(("compute_statistics", _statistics(games), games, "games"))
+    cases.append(("select_target", _select_target(calls), calls, "calls"))
+    cases.append(("draw_card", _draw_card(calls), calls, "calls"))
+    runs = 3 if quick else 10
+    for name, argv in (
+        ("import main", ["-c", "import main"]),
+        ("cli stats", ["cli.py", "stats", "--games", "20", "--seed", "0"]),
+        ("cli matrix", ["cli.py", "matrix", "--players", "3", "--games", "1", "--workers", "1", "--seed", "0"]),
+    ):
+        cases.append((f"cold start[{name}]", _cold_start(argv, runs), runs, "starts"))
+    requests = 5 if quick else 20
+    for url, units in (
+        ("/simulate?players=4", 1),
+        ("/statistics?players=4&games=50&log=none", 50),
+        ("/probability-matrix?players=4&games=5&seed=0", 5 * 42),
+    ):
+        cases.append((f"GET {url}", _endpoint(client, url, requests), requests * units, "games"))
+    return cases
+
+
+def run_cases(cases, repeat, quick=False, memory=True):
+    results = {}
+    for name, func, units, unit_name in cases:
+        best = min(_timed(func) for _ in range(repeat))
+        results[name] = {
+            "seconds": best,
+            "units": units,
+            "unit": unit_name,
+            f"{unit_name}_per_sec": units / best,
+        }
+        if memory:
+            results[name].update(measure_rss(name, quick))
+        print(f"{name:<55} {units / best:>12.0f} {unit_name}/s  {best:8.3f}s", flush=True)
+    return results
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def compare(results, baseline, threshold):
+    """Return ``[(name, baseline_rate, rate)]`` for cases slower than allowed."""
+    regressions = []
+    for name, data in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        key = f"{data['unit']}_per_sec"
+        if data[key] < old[key] * (1 - threshold):
+            regressions.append((name, old[key], data[key]))
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown before a case is a regression")
+    parser.add_argument("--measure", metavar="CASE", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        # The case runs alone here, so its peak does not include earlier cases.
+        func = {name: func for name, func, _units, _unit in build_cases(args.quick)}[args.measure]
+        func()
+        print(json.dumps({
+            "peak_rss_kb": _peak_rss_kb(resource.RUSAGE_SELF),
+            "children_peak_rss_kb": _peak_rss_kb(resource.RUSAGE_CHILDREN),
+        }))
+        return 0
+
+    results = run_cases(build_cases(args.quick), args.repeat, args.quick)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.time(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old:.0f} -> {new:.0f} ({new / old - 1:+.0%})")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
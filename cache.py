@@ -0,0 +1,169 @@
+"""Memoization of expensive simulation results.
+
+``ResultCache`` keeps recent values in a size-bounded in-memory LRU and can
+optionally persist them in a local SQLite file, so results survive a restart
+of the service. Values must be JSON serialisable to use the disk tier.
+Concurrent ``get_or_compute`` calls for the same key run ``compute`` once.
+"""
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Modules whose source determines the outcome of a simulation, by either
+# engine (``ResultStore`` also keeps games of ``batch_engine``).
+SIMULATION_MODULES = ("main.py", "utils.py", "targeting.py", "state.py", "config.py", "batch_engine.py")
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(modules=SIMULATION_MODULES):
+    """Return a short hash of the source files in ``modules``.
+
+    Used as part of every cache key so results computed by an older version
+    of the rules are never served after the code changes. Callers whose
+    output also depends on other modules pass their own list.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in modules:
+        with open(os.path.join(base, name), "rb") as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+class _Flight:
+    """A computation in progress, shared by every caller asking for its key."""
+
+    __slots__ = ("done", "value", "ok")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class ResultCache:
+    """LRU cache with an optional SQLite tier.
+
+    ``maxsize`` bounds the number of entries kept in memory. With
+    ``maxbytes`` the entries are also bounded by their total size, measured
+    by ``sizeof(value)`` (the length of the JSON encoding by default); a
+    value larger than ``maxbytes`` is returned but not kept. When ``path`` is
+    given, values are also written to (and looked up in) a SQLite database
+    at that location.
+    """
+
+    def __init__(self, maxsize=32, path=None, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or (lambda value: len(json.dumps(value)))
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        if path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key)
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` or ``default``."""
+        skey = self._key(key)
+        with self._lock:
+            if skey in self._entries:
+                self._entries.move_to_end(skey)
+                return self._entries[skey]
+        if self.path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM results WHERE key = ?", (skey,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self._remember(skey, value)
+                return value
+        return default
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` in memory and, if enabled, on disk."""
+        skey = self._key(key)
+        self._remember(skey, value)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                    (skey, json.dumps(value)),
+                )
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute()`` on a miss.
+
+        While one thread computes a key, other callers for the same key wait
+        for its value instead of computing it again. If ``compute`` raises,
+        the exception goes to that caller and a waiting caller computes
+        the value itself.
+        """
+        skey = self._key(key)
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            with self._lock:
+                flight = self._inflight.get(skey)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[skey] = _Flight()
+            if not leader:
+                flight.done.wait()
+                if flight.ok:
+                    return flight.value
+                continue
+            try:
+                value = compute()
+                self.set(key, value)
+                flight.value, flight.ok = value, True
+                return value
+            finally:
+                with self._lock:
+                    del self._inflight[skey]
+                flight.done.set()
+
+    def clear(self):
+        """Drop the in-memory entries (the disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, skey, value):
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        with self._lock:
+            self._forget(skey)
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._entries[skey] = value
+            self._sizes[skey] = size
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes
+            ):
+                self._forget(next(iter(self._entries)))
+
+    def _forget(self, skey):
+        if skey in self._entries:
+            del self._entries[skey]
+            self.nbytes -= self._sizes.pop(skey)
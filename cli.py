@@ -0,0 +1,227 @@
+"""Command-line runner for scripted simulations.
+
+Usage::
+
+    python cli.py simulate --players 5 --games 100 --seed 1 --format json
+    python cli.py stats --players 4 --games 5000 --output stats.csv
+    python cli.py matrix --players 6 --games 50 --workers 4 --format parquet --output m.parquet
+    python cli.py sweep --players 3-7 --games 1000 --grid '{"beer_threshold": [1, 2, 3]}'
+
+``simulate`` writes one row per game, ``stats`` the win rate per role and
+per character/role, ``matrix`` the probability matrix and ``sweep`` the
+tidy table of ``sweep.run_sweep`` over the player counts and the rule
+settings of ``--grid`` (resumable with ``--checkpoint``). Rows go to
+``--output`` (stdout by default) as CSV, newline-delimited JSON or
+Parquet. CSV and JSON rows are flushed as soon as they are ready; Parquet
+is written when the command ends. ``simulate`` only imports pandas for
+Parquet output.
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import sys
+
+import main
+from events import SUMMARY, EventLog
+from sweep import run_sweep
+from utils import derive_seed
+
+FORMATS = ("csv", "json", "parquet")
+
+
+class RowWriter:
+    """Write dict rows as CSV, NDJSON or Parquet to a file or stdout."""
+
+    def __init__(self, fmt, output=None):
+        if fmt == "parquet":
+            if not output:
+                raise ValueError("--format parquet needs --output")
+            if not any(importlib.util.find_spec(name) for name in ("pyarrow", "fastparquet")):
+                raise ValueError("--format parquet needs pyarrow or fastparquet installed")
+        self.fmt = fmt
+        self.output = output
+        self._rows = []
+        self._csv = None
+        self._fh = None
+        if fmt != "parquet":
+            self._fh = open(output, "w", newline="") if output else sys.stdout
+
+    def write(self, row):
+        if self.fmt == "parquet":
+            self._rows.append(row)
+            return
+        if self.fmt == "json":
+            self._fh.write(json.dumps(row) + "\n")
+        else:
+            if self._csv is None:
+                self._csv = csv.DictWriter(self._fh, fieldnames=list(row))
+                self._csv.writeheader()
+            self._csv.writerow({
+                key: ";".join(map(str, value)) if isinstance(value, list) else value
+                for key, value in row.items()
+            })
+        self._fh.flush()
+
+    def close(self):
+        if self.fmt == "parquet":
+            import pandas as pd
+
+            pd.DataFrame(self._rows).to_parquet(self.output, index=False)
+        elif self._fh is not sys.stdout:
+            self._fh.close()
+
+
+def _players(value):
+    """Parse ``4``, ``3,5`` or ``3-7`` into a list of player counts."""
+    counts = []
+    for part in value.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            counts.extend(range(int(first), int(last) + 1))
+        else:
+            counts.append(int(part))
+    for count in counts:
+        if count not in main.ROLE_DISTRIBUTION:
+            raise argparse.ArgumentTypeError("players must be between 3 and 7")
+    return counts
+
+
+def _characters(value):
+    return [c.strip() for c in value.split(",")]
+
+
+def _single(args):
+    if len(args.players) != 1:
+        raise ValueError(f"{args.command} takes a single --players value")
+    return args.players[0]
+
+
+def _simulate_rows(args):
+    players_count = _single(args)
+    seed = args.seed if args.seed is not None else main.new_seed()
+    for i in range(args.games):
+        game_seed = derive_seed(seed, i)
+        log = EventLog(SUMMARY)
+        winner, players = main.simulate_game(
+            players_count, args.characters, game_number=i + 1, seed=game_seed, log=log,
+        )
+        eq_round, break_round = log.nash_rounds(i + 1)
+        yield {
+            "game": i + 1,
+            "seed": game_seed,
+            "winner": winner,
+            "rounds": log.end_rounds[i + 1],
+            "equilibrium_round": eq_round,
+            "break_round": break_round,
+            "characters": [p.character for p in players],
+            "roles": [p.role for p in players],
+            "alive": [p.alive for p in players],
+        }
+
+
+def _summary(players_count, args):
+    """Return the ``iter_statistics`` summary for ``players_count``."""
+    for record in main.iter_statistics(
+        players_count, args.games, args.seed, log_level=None,
+        characters=args.characters, store=main.RESULT_STORE,
+    ):
+        if record["type"] == "summary":
+            return record
+
+
+def _stats_rows(args):
+    summary = _summary(_single(args), args)
+    for row in summary["role_stats"]:
+        yield {"Role": row["Role"], "Character": "", "Win Rate (%)": row["Win Rate (%)"]}
+    for row in summary["role_character_stats"]:
+        for role, rate in row.items():
+            if role != "Character":
+                yield {"Role": role, "Character": row["Character"], "Win Rate (%)": rate}
+
+
+def _matrix_rows(args):
+    df = main.compute_probability_matrix(
+        _single(args), games_per_combo=args.games, workers=args.workers, seed=args.seed,
+        ci_half_width=args.ci, store=None if args.paired else main.RESULT_STORE, paired=args.paired,
+    )
+    yield from df.to_dict(orient="records")
+
+
+def _grid(value):
+    """Parse ``--grid`` as JSON, or read it from a file given as ``@path``."""
+    if value.startswith("@"):
+        with open(value[1:]) as fh:
+            value = fh.read()
+    try:
+        grid = json.loads(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid JSON: {exc}")
+    if not isinstance(grid, dict):
+        raise argparse.ArgumentTypeError("the grid must be a JSON object of lists")
+    return grid
+
+
+def _sweep_rows(args):
+    grid = {"players": args.players, **args.grid}
+    if args.characters:
+        grid.setdefault("character_pool", [args.characters])
+    yield from run_sweep(grid, args.games, args.seed, args.workers, args.checkpoint)
+
+
+COMMANDS = {
+    "simulate": (_simulate_rows, 1, "play games and write one row per game"),
+    "stats": (_stats_rows, 5000, "win rate per role and per character/role"),
+    "matrix": (_matrix_rows, 50, "character x role probability matrix (games per combo)"),
+    "sweep": (_sweep_rows, 1000, "win rate per outcome for each cell of a parameter grid"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_rows, games, help_text) in COMMANDS.items():
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--players", type=_players, default=[4],
+                         help="player count; sweep also takes lists like 3,5 or ranges like 3-7")
+        cmd.add_argument("--games", type=int, default=games)
+        if name != "matrix":
+            cmd.add_argument("--characters", type=_characters,
+                             help="comma separated characters, one per player (sweep: the pool to draw from)")
+        cmd.add_argument("--seed", type=int)
+        if name in ("matrix", "sweep"):
+            cmd.add_argument("--workers", type=int, help="processes (default: all cores)")
+        cmd.add_argument("--format", choices=FORMATS, default="csv")
+        cmd.add_argument("--output", help="file to write (default: stdout)")
+        if name == "sweep":
+            cmd.add_argument("--grid", type=_grid, default={},
+                             help="JSON object (or @file) of SimulationConfig fields to lists of values")
+            cmd.add_argument("--checkpoint", help="file recording finished cells, to resume a sweep")
+        if name == "matrix":
+            cmd.add_argument("--ci", type=float,
+                             help="target CI half-width in percent for adaptive sampling")
+            cmd.add_argument("--paired", action="store_true",
+                             help="play every character in the same scenarios and report win-rate deltas")
+    return parser
+
+
+def main_cli(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "ci", None) is not None:
+        args.ci /= 100
+    rows, _games, _help = COMMANDS[args.command]
+    try:
+        writer = RowWriter(args.format, args.output)
+        try:
+            for row in rows(args):
+                writer.write(row)
+        finally:
+            writer.close()
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,63 @@
+"""Rule settings of a simulated game.
+
+``SimulationConfig`` gathers the knobs that ``main.simulate_game`` used to
+read from module constants or literals: the round cap, the chance that
+DYNAMITE explodes, the life at which a player drinks a BEER, the deck
+composition and the pool characters are drawn from. ``DEFAULT_CONFIG``
+reproduces the standard rules, so games played without a config are
+unchanged.
+"""
+from utils import CARD_IDS, CHARACTERS, DECK_COUNTS
+
+DYNAMITE_EXPLOSION_PROB = 8 / 52
+
+
+class SimulationConfig:
+    """Rule knobs passed to ``simulate_game(config=...)``.
+
+    ``deck_counts`` only needs the cards whose count changes; the others keep
+    their ``DECK_COUNTS`` count. ``character_pool=None`` draws from every
+    registered character (``utils.CHARACTERS``).
+    """
+
+    __slots__ = ("rounds", "dynamite_explosion_prob", "beer_threshold", "deck_counts", "character_pool")
+
+    def __init__(self, rounds=500, dynamite_explosion_prob=DYNAMITE_EXPLOSION_PROB, beer_threshold=2,
+                 deck_counts=None, character_pool=None):
+        unknown = set(deck_counts or ()) - set(CARD_IDS)
+        if unknown:
+            raise ValueError(f"Unknown cards: {sorted(unknown)}")
+        if character_pool is not None:
+            invalid = [c for c in character_pool if c not in CHARACTERS]
+            if invalid:
+                raise ValueError(f"Invalid characters: {invalid}")
+        self.rounds = rounds
+        self.dynamite_explosion_prob = dynamite_explosion_prob
+        self.beer_threshold = beer_threshold
+        self.deck_counts = {**DECK_COUNTS, **(deck_counts or {})}
+        self.character_pool = list(character_pool) if character_pool is not None else None
+
+    def characters(self):
+        """Characters a game without fixed characters samples from."""
+        return CHARACTERS if self.character_pool is None else self.character_pool
+
+    def replace(self, **changes):
+        """Return a copy with ``changes`` applied."""
+        return SimulationConfig(**{**self.as_dict(), **changes})
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if not isinstance(other, SimulationConfig):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.as_dict().items())
+        return f"SimulationConfig({fields})"
+
+
+DEFAULT_CONFIG = SimulationConfig()
@@ -0,0 +1,165 @@
+"""Columnar event recorder used by ``simulate_game``.
+
+Events are appended to typed ``array`` columns (action, game, round, seat,
+card, target, hp) instead of one dict per event. Hand snapshots are copies
+of the count vector of ``state.Hand`` and are only kept at the ``HANDS``
+verbosity level. ``EventLog.to_dicts`` rebuilds the dict format used by the
+API when the log is serialized.
+"""
+from array import array
+
+from utils import CARD_NAMES
+
+# Niveis de detalhe, do mais enxuto ao mais completo.
+SUMMARY, EVENTS, HANDS = range(3)
+LEVELS = {"summary": SUMMARY, "events": EVENTS, "hands": HANDS}
+
+ACTIONS = (
+    "setup", "nash_equilibrium", "nash_equilibrium_broken", "turn_start", "draw",
+    "equip", "beer", "attack", "damaged", "death", "turn_end", "game_end",
+)
+(SETUP, NASH_EQUILIBRIUM, NASH_BROKEN, TURN_START, DRAW, EQUIP, BEER, ATTACK,
+ DAMAGED, DEATH, TURN_END, GAME_END) = range(len(ACTIONS))
+
+_HAND_SIZE = len(CARD_NAMES)
+
+
+class EventLog:
+    """Event buffer shared by one or more games.
+
+    ``level`` controls what is recorded: ``SUMMARY`` keeps setup, Nash
+    equilibrium, deaths and game end; ``EVENTS`` adds every turn action and
+    ``HANDS`` also stores the hand of the acting player.
+    """
+
+    def __init__(self, level=HANDS):
+        if isinstance(level, str):
+            level = LEVELS[level]
+        self.level = level
+        self.keep_turns = level >= EVENTS
+        self.keep_hands = level >= HANDS
+        self.action = array("B")
+        self.game = array("I")
+        self.round = array("I")
+        self.player = array("b")
+        self.card = array("b")
+        self.target = array("b")
+        self.hp = array("b")
+        self.hand_at = array("l")
+        self.hands = array("H")
+        self.setups = {}
+        self.seeds = {}
+        self.drawn = {}
+        self.start_hp = {}
+        self.winners = {}
+        self.end_rounds = {}
+        self.nash = {}
+
+    def __len__(self):
+        return len(self.action)
+
+    def __iter__(self):
+        return self.iter_dicts()
+
+    def __eq__(self, other):
+        if isinstance(other, EventLog):
+            other = other.to_dicts()
+        return self.to_dicts() == other
+
+    def event(self, action, game, round_, player=-1, card=-1, target=-1, hp=0, hand=None):
+        """Append one event; ``hand`` is a ``state.Hand`` snapshot source."""
+        self.action.append(action)
+        self.game.append(game)
+        self.round.append(round_)
+        self.player.append(player)
+        self.card.append(card)
+        self.target.append(target)
+        self.hp.append(hp)
+        if hand is not None and self.keep_hands:
+            self.hand_at.append(len(self.hands))
+            self.hands.extend(hand.counts)
+        else:
+            self.hand_at.append(-1)
+
+    def setup(self, game, players, seed=None, drawn=(True, True)):
+        """Record the seats of ``game``: characters, roles and starting life.
+
+        ``seed`` is the seed the game's generator was created from, when
+        known, and ``drawn`` tells whether the roles and the characters were
+        drawn from it, so the game can be replayed.
+        """
+        self.setups[game] = [(p.character, p.role) for p in players]
+        self.start_hp[game] = [p.hp for p in players]
+        self.seeds[game] = seed
+        self.drawn[game] = drawn
+        self.event(SETUP, game, 0)
+
+    def equilibrium(self, game, round_, broken=False):
+        """Record entering (or leaving, when ``broken``) a Nash equilibrium."""
+        first = self.nash.setdefault(game, [None, None])
+        if first[broken] is None:
+            first[broken] = round_
+        self.event(NASH_BROKEN if broken else NASH_EQUILIBRIUM, game, round_)
+
+    def game_end(self, game, round_, winner):
+        """Record the winner of ``game`` after ``round_`` rounds."""
+        self.winners[game] = winner
+        self.end_rounds[game] = round_
+        self.event(GAME_END, game, round_)
+
+    def nash_rounds(self, game):
+        """Return the first ``(equilibrium_round, break_round)`` of ``game``."""
+        eq_round, break_round = self.nash.get(game, (None, None))
+        return eq_round, break_round
+
+    def to_dicts(self):
+        """Return the events in the dict format of the API."""
+        return list(self.iter_dicts())
+
+    def iter_dicts(self):
+        """Yield the events one by one in the dict format of the API."""
+        hands = self.hands
+        decoded = {}
+        for i, action in enumerate(self.action):
+            game = self.game[i]
+            if action == SETUP:
+                yield {
+                    "game": game,
+                    "action": "setup",
+                    "players": [
+                        {"character": character, "role": role}
+                        for character, role in self.setups[game]
+                    ],
+                }
+                continue
+            if action == GAME_END:
+                yield {
+                    "game": game,
+                    "round": self.round[i],
+                    "action": "game_end",
+                    "winner": self.winners[game],
+                }
+                continue
+            entry = {"game": game, "round": self.round[i]}
+            if self.player[i] >= 0:
+                character, role = self.setups[game][self.player[i]]
+                entry["player"] = character
+                entry["role"] = role
+            entry["action"] = ACTIONS[action]
+            if self.card[i] >= 0:
+                entry["card"] = CARD_NAMES[self.card[i]]
+            if self.target[i] >= 0:
+                entry["target"] = self.setups[game][self.target[i]][0]
+            if action == BEER or action == DAMAGED:
+                entry["new_hp"] = self.hp[i]
+            start = self.hand_at[i]
+            if start >= 0:
+                counts = hands[start:start + _HAND_SIZE].tobytes()
+                hand = decoded.get(counts)
+                if hand is None:
+                    hand = decoded[counts] = [
+                        name for name, n in zip(CARD_NAMES, hands[start:start + _HAND_SIZE])
+                        for _ in range(n)
+                    ]
+                entry["hand"] = list(hand)
+            yield entry
@@ -0,0 +1,173 @@
+"""In-process job queue for long-running simulations.
+
+``JobManager`` runs simulation specs on a bounded thread pool so the Flask
+request that submits them returns immediately. Jobs report progress as
+games completed, identical specs share one job while it is queued or
+running, and finished jobs are evicted ``ttl`` seconds after they end.
+"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from main import RESULT_STORE, ROLE_DISTRIBUTION, cached_probability_matrix, compute_statistics
+from utils import CHARACTERS
+
+KINDS = ("statistics", "probability_matrix")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def normalize_spec(spec):
+    """Validate a job spec and fill in defaults.
+
+    Raises ``ValueError`` for unknown kinds, player counts or characters.
+    """
+    kind = spec.get("kind", "statistics")
+    if kind not in KINDS:
+        raise ValueError(f"Invalid kind: {kind}")
+    players = int(spec.get("players", 4))
+    if players not in ROLE_DISTRIBUTION:
+        raise ValueError("players must be between 3 and 7")
+    games = int(spec.get("games", 500 if kind == "statistics" else 50))
+    if games <= 0:
+        raise ValueError("games must be positive")
+    seed = spec.get("seed")
+    seed = int(seed) if seed not in (None, "") else None
+    characters = spec.get("characters") or None
+    if isinstance(characters, str):
+        characters = [c.strip() for c in characters.split(",")]
+    if characters is not None:
+        if kind != "statistics":
+            raise ValueError("characters are only supported by statistics jobs")
+        if len(characters) != players or any(c not in CHARACTERS for c in characters):
+            raise ValueError("characters must list one valid character per player")
+    return {"kind": kind, "players": players, "games": games, "characters": characters, "seed": seed}
+
+
+class Job:
+    """State of one submitted spec."""
+
+    def __init__(self, spec):
+        self.id = uuid.uuid4().hex
+        self.spec = spec
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    def progress(self, done, total):
+        self.done = done
+        self.total = total
+
+    def eta(self):
+        """Seconds left estimated from the pace so far (``None`` if unknown)."""
+        if self.status != RUNNING or not self.done or not self.total:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed / self.done * (self.total - self.done)
+
+    def as_dict(self, include_result=True):
+        data = {
+            "id": self.id,
+            "spec": self.spec,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total},
+            "eta": self.eta(),
+        }
+        if self.status == FAILED:
+            data["error"] = self.error
+        if self.status == DONE and include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """Bounded worker pool plus a registry of jobs keyed by id and spec.
+
+    Matrix jobs use up to ``matrix_workers`` processes each (by default the
+    cores split between the ``max_workers`` threads), started with the
+    ``spawn`` method because forking a threaded process can deadlock.
+    """
+
+    def __init__(self, max_workers=2, ttl=3600, matrix_workers=None):
+        self.ttl = ttl
+        if matrix_workers is None:
+            matrix_workers = max(1, (os.cpu_count() or 1) // max_workers)
+        self.matrix_workers = matrix_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._jobs = {}
+        self._by_spec = {}
+        self._lock = threading.Lock()
+
+    def submit(self, spec):
+        """Queue ``spec`` (or return the job already running it)."""
+        spec = normalize_spec(spec)
+        key = json.dumps(spec, sort_keys=True)
+        with self._lock:
+            self._evict()
+            job = self._jobs.get(self._by_spec.get(key))
+            if job is not None and job.status in (QUEUED, RUNNING):
+                return job
+            job = Job(spec)
+            self._jobs[job.id] = job
+            self._by_spec[key] = job.id
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        """Return the job with ``job_id`` or ``None`` if unknown/expired."""
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def _evict(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        for key in [k for k, job_id in self._by_spec.items() if job_id not in self._jobs]:
+            del self._by_spec[key]
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        spec = job.spec
+        try:
+            if spec["kind"] == "statistics":
+                job.total = spec["games"]
+                job.result = compute_statistics(
+                    players_count=spec["players"], games=spec["games"], seed=spec["seed"],
+                    log_level=None, characters=spec["characters"], progress=job.progress,
+                    store=RESULT_STORE,
+                )
+            else:
+                # Sem progresso quando a matriz vem do cache: o total ja e conhecido.
+                combos = len(CHARACTERS) * len(ROLE_DISTRIBUTION[spec["players"]])
+                job.total = spec["games"] * combos
+                df = cached_probability_matrix(
+                    players_count=spec["players"], games_per_combo=spec["games"],
+                    seed=spec["seed"], progress=job.progress, workers=self.matrix_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                job.result = df.to_dict(orient="records")
+            job.done = job.total
+            job.status = DONE
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
@@ -1,18 +1,30 @@
+import itertools
+import math
 import random
 import os
 
 # Permite definir uma semente via variavel de ambiente.
 # Se nenhuma for informada, usa a aleatoriedade padrao do Python.
+# A semente alimenta apenas o gerador que sorteia as sementes de cada partida;
+# o modulo global ``random`` nao e alterado.
 RANDOM_SEED = os.getenv("BANG_SEED")
 if RANDOM_SEED is not None:
     try:
-        random.seed(int(RANDOM_SEED))
+        RANDOM_SEED = int(RANDOM_SEED)
     except ValueError:
-        random.seed(RANDOM_SEED)
-from utils import build_deck, draw_card, WEAPON_RANGES, CHARACTER_PERKS, CHARACTERS
-from targeting import select_target
+        pass
+_seed_source = random.Random(RANDOM_SEED)
 
-DYNAMITE_EXPLOSION_PROB = 8 / 52
+from utils import Deck, draw_card, derive_seed, perk_hooks, CARD_NAMES, WEAPON_RANGES, CHARACTER_PERKS, CHARACTERS
+from targeting import TargetingIndex, select_target
+from state import BANG, BEER, EQUIPMENT_IDS, MISSED, MUSTANG, SCOPE, AliveCounts, Player
+from cache import ResultCache, code_version
+from events import ATTACK, DAMAGED, DEATH, DRAW, EQUIP, HANDS, SUMMARY, TURN_END, TURN_START, EventLog
+from events import BEER as BEER_EVENT
+from store import ResultStore
+from table import Table, pivot
+# ``DYNAMITE_EXPLOSION_PROB`` e ``SimulationConfig`` continuam acessiveis por ``main``.
+from config import DEFAULT_CONFIG, DYNAMITE_EXPLOSION_PROB, SimulationConfig
 
 
 ROLE_DISTRIBUTION = {
@@ -24,33 +36,266 @@ ROLE_DISTRIBUTION = {
 }
 
 
-def get_roles(players_count):
+def new_seed():
+    """Sorteia uma semente base nova (reprodutivel quando ``BANG_SEED`` existe)."""
+    return _seed_source.getrandbits(64)
+
+
+def get_roles(players_count, rng=None):
     """Return a shuffled list of roles for the game based on player count."""
     if players_count not in ROLE_DISTRIBUTION:
         raise ValueError("Numero de jogadores deve estar entre 3 e 7.")
     roles = []
     for role, count in ROLE_DISTRIBUTION[players_count].items():
         roles.extend([role] * count)
-    random.shuffle(roles)
+    (rng or random).shuffle(roles)
     return roles
 
 
-def generate_setup(fixed_character, fixed_role, players_count):
-    """Gera personagens e funcoes com um personagem fixo em determinada funcao."""
-    roles = get_roles(players_count)
+def generate_setup(fixed_character, fixed_role, players_count, rng=None):
+    """Gera personagens e funcoes com um personagem fixo em determinada funcao.
+
+    O personagem fixo ocupa um assento sorteado; os demais assentos recebem
+    personagens e funcoes aleatorios.
+    """
+    rng = rng or random
+    roles = get_roles(players_count, rng)
     roles.remove(fixed_role)
-    random.shuffle(roles)
-    roles = [fixed_role] + roles
+    rng.shuffle(roles)
 
     remaining_characters = [c for c in CHARACTERS if c != fixed_character]
-    characters = [fixed_character] + random.sample(remaining_characters, players_count - 1)
+    characters = rng.sample(remaining_characters, players_count - 1)
+    seat = rng.randrange(players_count)
+    roles.insert(seat, fixed_role)
+    characters.insert(seat, fixed_character)
     return characters, roles
 
 
-def compute_probability_matrix(players_count=4, games_per_combo=50):
-    """Executa simulacoes em paralelo para gerar matriz de vitorias e derrotas."""
-    import threading
-    import pandas as pd
+# Quantidade de partidas de cada tarefa enviada aos processos.
+MATRIX_CHUNK_GAMES = 25
+
+# Matrizes ja calculadas; ``BANG_CACHE_DB`` ativa a copia em disco (SQLite).
+MATRIX_CACHE = ResultCache(maxsize=32, path=os.getenv("BANG_CACHE_DB"))
+
+# Partidas acumuladas entre execucoes; ativado com ``BANG_RESULTS_DB``.
+RESULT_STORE = ResultStore(os.environ["BANG_RESULTS_DB"]) if os.getenv("BANG_RESULTS_DB") else None
+
+
+def _target_team(role):
+    """Retorna o time vencedor que conta como vitoria para a funcao."""
+    if role == "Outlaw":
+        return "Outlaws"
+    if role == "Deputy":
+        return "Sheriff"
+    return role
+
+
+def _run_combo_chunk(task):
+    """Executa um bloco de partidas de uma combinacao personagem/funcao.
+
+    A partida ``i`` da combinacao usa a semente
+    ``derive_seed(seed, character, role, i)``; o resultado nao depende de como
+    as partidas foram divididas entre os processos. Retorna
+    ``{(personagem, funcao): [vitorias, partidas]}`` contando apenas o assento
+    fixo ou, com ``all_seats``, todos os assentos de cada partida. Com
+    ``keep_games`` tambem retorna os argumentos de ``ResultStore.record`` de
+    cada partida.
+    """
+    character, role, players_count, seed, start, games, all_seats, keep_games = task
+    counts = {}
+    games_played = []
+    deck = Deck()
+    for i in range(start, start + games):
+        game_seed = derive_seed(seed, character, role, i)
+        rng = random.Random(game_seed)
+        chars, roles = generate_setup(character, role, players_count, rng)
+        log = EventLog(SUMMARY) if keep_games else None
+        result, players = simulate_game(players_count, chars, roles=roles, rng=rng, log=log, deck=deck)
+        for seat in (zip(chars, roles) if all_seats else [(character, role)]):
+            record = counts.setdefault(seat, [0, 0])
+            record[0] += result == _target_team(seat[1])
+            record[1] += 1
+        if keep_games:
+            seats = [(p.character, p.role, p.alive) for p in players]
+            games_played.append((
+                game_seed, seats, result, log.end_rounds[1], *log.nash_rounds(1), chars.index(character),
+            ))
+    return counts, games, games_played
+
+
+def _run_paired_chunk(task):
+    """Executa um bloco de cenarios pareados de uma funcao.
+
+    O cenario ``s`` sorteia (com ``derive_seed(seed, "paired", role, s)``)
+    as funcoes, o assento da funcao ``role`` e os personagens dos demais
+    assentos; cada personagem de ``CHARACTERS`` joga entao nesse assento uma
+    partida com a mesma semente, ou seja, com o mesmo baralho e os mesmos
+    adversarios. Se o candidato ja estiver entre os adversarios, esse assento
+    recebe um personagem reserva sorteado. Retorna
+    ``({personagem: [vitorias, soma_delta, soma_delta2]}, partidas)``, onde
+    delta e a vitoria do personagem menos a media de vitorias do cenario.
+    """
+    role, players_count, seed, start, scenarios = task
+    sums = {character: [0, 0.0, 0.0] for character in CHARACTERS}
+    deck = Deck()
+    team = _target_team(role)
+    for s in range(start, start + scenarios):
+        game_seed = derive_seed(seed, "paired", role, s)
+        rng = random.Random(derive_seed(game_seed, "setup"))
+        roles = get_roles(players_count, rng)
+        roles.remove(role)
+        rng.shuffle(roles)
+        drawn = rng.sample(CHARACTERS, players_count)
+        others, spare = drawn[:-1], drawn[-1]
+        seat = rng.randrange(players_count)
+        roles.insert(seat, role)
+
+        wins = {}
+        for character in CHARACTERS:
+            chars = [spare if c == character else c for c in others]
+            chars.insert(seat, character)
+            result, _players = simulate_game(players_count, chars, roles=roles, seed=game_seed, deck=deck)
+            wins[character] = int(result == team)
+        mean = sum(wins.values()) / len(wins)
+        for character, won in wins.items():
+            delta = won - mean
+            record = sums[character]
+            record[0] += won
+            record[1] += delta
+            record[2] += delta * delta
+    return sums, scenarios * len(CHARACTERS)
+
+
+def _paired_matrix(players_count, scenarios, workers, seed, progress, z, mp_context=None):
+    """Linhas da matriz no modo pareado de ``compute_probability_matrix``."""
+    roles_list = ["Sheriff", "Deputy", "Outlaw", "Renegade"]
+    totals = {}
+    tasks = [
+        (role, players_count, seed, start, min(MATRIX_CHUNK_GAMES, scenarios - start))
+        for role in roles_list
+        if role in ROLE_DISTRIBUTION[players_count]
+        for start in range(0, scenarios, MATRIX_CHUNK_GAMES)
+    ]
+    total_games = scenarios * len(CHARACTERS) * len({task[0] for task in tasks})
+    done = 0
+    for (role, *_rest), (sums, games) in zip(tasks, _map_tasks(_run_paired_chunk, tasks, workers, mp_context=mp_context)):
+        for character, values in sums.items():
+            record = totals.setdefault((character, role), [0, 0.0, 0.0])
+            for k, value in enumerate(values):
+                record[k] += value
+        done += games
+        if progress is not None:
+            progress(done, total_games)
+
+    rows = []
+    for character in CHARACTERS:
+        for role in roles_list:
+            wins, delta_sum, delta_sq = totals.get((character, role), (0, 0.0, 0.0))
+            played = scenarios if (character, role) in totals else 0
+            row = _matrix_row(character, role, wins, played, z)
+            delta = se = None
+            if played:
+                delta = delta_sum / played
+                if played > 1:
+                    variance = max(0.0, delta_sq - delta_sum * delta_sum / played) / (played - 1)
+                    se = math.sqrt(variance / played) * 100
+                delta *= 100
+            row["Delta %"] = delta
+            row["Delta SE"] = se
+            rows.append(row)
+    rows.sort(key=lambda row: (row["Character"], row["Role"]))
+    return rows
+
+
+def _map_tasks(func, tasks, workers, ordered=True, mp_context=None):
+    """Executa ``func`` sobre ``tasks`` em processos ou de forma serial.
+
+    Os resultados sao gerados na ordem de ``tasks`` conforme ficam prontos;
+    com ``ordered=False`` cada resultado sai assim que sua tarefa termina.
+    ``mp_context`` (ex.: ``multiprocessing.get_context("spawn")``) define
+    como os processos sao criados.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context)
+        except (OSError, NotImplementedError):
+            # Sem suporte a multiprocessing (ex.: sandbox sem semaforos).
+            executor = None
+        if executor is not None:
+            with executor:
+                if not ordered:
+                    from concurrent.futures import as_completed
+
+                    futures = [executor.submit(func, task) for task in tasks]
+                    for future in as_completed(futures):
+                        yield future.result()
+                    return
+                chunksize = max(1, len(tasks) // (workers * 4))
+                yield from executor.map(func, tasks, chunksize=chunksize)
+            return
+    for task in tasks:
+        yield func(task)
+
+
+def wilson_interval(wins, games, z=1.959963984540054):
+    """Intervalo de Wilson ``(baixo, alto)`` para a proporcao ``wins / games``."""
+    if not games:
+        return 0.0, 1.0
+    p = wins / games
+    denom = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denom
+    margin = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def _matrix_row(character, role, wins, games, z):
+    """Linha da matriz; sem partidas (combinacao impossivel) taxas e IC sao ``None``."""
+    if not games:
+        return {"Character": character, "Role": role, "Win %": None, "Loss %": None,
+                "CI low": None, "CI high": None, "Games": 0}
+    low, high = wilson_interval(wins, games, z)
+    return {
+        "Character": character,
+        "Role": role,
+        "Win %": wins / games * 100,
+        "Loss %": (games - wins) / games * 100,
+        "CI low": low * 100,
+        "CI high": high * 100,
+        "Games": games,
+    }
+
+
+def compute_probability_matrix(players_count=4, games_per_combo=50, workers=None, seed=None, progress=None,
+                               ci_half_width=None, confidence=0.95, max_games_per_combo=2000, store=None,
+                               as_frame=False, paired=False, mp_context=None):
+    """Simula a matriz de vitorias e derrotas por personagem e funcao.
+
+    Retorna uma ``table.Table`` ordenada por personagem e funcao, ou um
+    ``pandas.DataFrame`` com ``as_frame=True``. As partidas sao divididas
+    entre ``workers`` processos (``None`` usa todos os nucleos) criados com
+    ``mp_context``; o resultado so depende de ``seed``. ``ci_half_width``,
+    ``confidence`` e ``max_games_per_combo`` controlam a amostragem
+    adaptativa, ``store`` reaproveita partidas guardadas, ``paired=True``
+    compara os personagens nos mesmos cenarios e ``progress(concluidas,
+    total)`` e chamado a cada bloco concluido.
+    """
+    # ``statistics`` (via ``fractions``/``decimal``) so e carregado aqui.
+    from statistics import NormalDist
+
+    if players_count not in ROLE_DISTRIBUTION:
+        raise ValueError("Numero de jogadores deve estar entre 3 e 7.")
+    if seed is None:
+        seed = new_seed()
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    if paired:
+        if ci_half_width is not None or store is not None:
+            raise ValueError("O modo pareado nao aceita ci_half_width nem store.")
+        table = Table(_paired_matrix(players_count, games_per_combo, workers, seed, progress, z, mp_context))
+        return table.as_frame() if as_frame else table
 
     roles_list = ["Sheriff", "Deputy", "Outlaw", "Renegade"]
     outcomes = {
@@ -58,142 +303,379 @@ def compute_probability_matrix(players_count=4, games_per_combo=50):
         for char in CHARACTERS
         for role in roles_list
     }
-    lock = threading.Lock()
-
-    def worker(character, role):
-        wins = 0
-        for _ in range(games_per_combo):
-            chars, roles = generate_setup(character, role, players_count)
-            result, players = simulate_game(players_count, chars, roles=roles)
-            if role == "Outlaw":
-                target_team = "Outlaws"
-            elif role == "Deputy":
-                target_team = "Sheriff"
-            else:
-                target_team = role
-            if result == target_team:
-                wins += 1
-        with lock:
-            outcomes[(character, role)]["wins"] += wins
-            outcomes[(character, role)]["losses"] += games_per_combo - wins
-
-    threads = []
-    for character in CHARACTERS:
-        for role in roles_list:
-            t = threading.Thread(target=worker, args=(character, role))
-            t.start()
-            threads.append(t)
-
-    for t in threads:
-        t.join()
-
-    matrix_rows = []
-    for (char, role), data in outcomes.items():
-        total = data["wins"] + data["losses"]
-        win_rate = data["wins"] / total * 100 if total else 0
-        loss_rate = data["losses"] / total * 100 if total else 0
-        matrix_rows.append({
-            "Character": char,
-            "Role": role,
-            "Win %": win_rate,
-            "Loss %": loss_rate,
-        })
+    combos = [
+        (character, role)
+        for character in CHARACTERS
+        for role in roles_list
+        if role in ROLE_DISTRIBUTION[players_count]
+    ]
 
-    df = pd.DataFrame(matrix_rows)
-    return df.sort_values(["Character", "Role"]).reset_index(drop=True)
+    # ``scheduled`` e o indice da proxima partida de cada combinacao; com
+    # ``store`` ele comeca no total guardado, que nunca e menor que o numero
+    # de partidas ja simuladas para a combinacao fixa.
+    scheduled = dict.fromkeys(combos, 0)
+    if store is not None:
+        for combo, (wins, played) in store.seat_totals(players_count).items():
+            if combo in scheduled:
+                outcomes[combo]["wins"] += wins
+                outcomes[combo]["losses"] += played - wins
+                scheduled[combo] = played
+
+    if ci_half_width is not None:
+        games_per_combo = min(games_per_combo, max_games_per_combo)
+    pending = {
+        combo: games_per_combo - scheduled[combo]
+        for combo in combos
+        if scheduled[combo] < games_per_combo
+    }
+    if ci_half_width is None:
+        total_games = sum(pending.values())
+    else:
+        total_games = max_games_per_combo * len(combos)
+    # O armazenamento guarda so o assento fixo de cada partida; contar todos
+    # os assentos faria a mesma chamada mudar de resultado ao ser repetida.
+    all_seats = store is None and len(pending) == len(combos) and len(set(pending.values())) == 1
+    done = 0
+    while True:
+        tasks = []
+        for (character, role), games in pending.items():
+            first = scheduled[(character, role)]
+            scheduled[(character, role)] += games
+            for start in range(0, games, MATRIX_CHUNK_GAMES):
+                chunk = min(MATRIX_CHUNK_GAMES, games - start)
+                tasks.append((
+                    character, role, players_count, seed, first + start, chunk, all_seats,
+                    store is not None,
+                ))
+
+        for counts, games, games_played in _map_tasks(_run_combo_chunk, tasks, workers, mp_context=mp_context):
+            for combo, (wins, played) in counts.items():
+                outcomes[combo]["wins"] += wins
+                outcomes[combo]["losses"] += played - wins
+            for game in games_played:
+                store.record("scalar", players_count, *game)
+            done += games
+            if progress is not None:
+                progress(done, total_games)
+
+        all_seats = False
+        if ci_half_width is None:
+            break
+        pending = {}
+        for combo in combos:
+            wins = outcomes[combo]["wins"]
+            played = wins + outcomes[combo]["losses"]
+            low, high = wilson_interval(wins, played, z)
+            if (high - low) / 2 <= ci_half_width or played >= max_games_per_combo:
+                continue
+            # Estimativa (aproximacao normal) de quantas partidas faltam.
+            p = wins / played
+            needed = math.ceil(z * z * p * (1 - p) / ci_half_width ** 2) - played
+            pending[combo] = min(max(needed, MATRIX_CHUNK_GAMES), max_games_per_combo - played)
+        if not pending:
+            break
+
+    if store is not None:
+        store.flush()
+
+    matrix_rows = [
+        _matrix_row(char, role, data["wins"], data["wins"] + data["losses"], z)
+        for (char, role), data in outcomes.items()
+    ]
 
+    matrix_rows.sort(key=lambda row: (row["Character"], row["Role"]))
+    table = Table(matrix_rows)
+    return table.as_frame() if as_frame else table
 
-def compute_statistics(players_count=4, games=500):
-    """Executa multiplas partidas e retorna estatisticas e log completo."""
-    import pandas as pd
 
-    results_roles = {"Sheriff": 0, "Outlaws": 0, "Renegade": 0, "Draw": 0}
-    results_details = {}
-    logs = []
-    game_results = []
-    nash_list = []
+def cached_probability_matrix(players_count=4, games_per_combo=50, seed=None, progress=None,
+                              ci_half_width=None, confidence=0.95, max_games_per_combo=2000,
+                              as_frame=False, paired=False, workers=None, mp_context=None):
+    """Versao memorizada de ``compute_probability_matrix``.
 
+    A chave inclui ``(players_count, games_per_combo, seed)``, os parametros
+    da amostragem adaptativa, o modo pareado e a versao do codigo da
+    simulacao. Chamadas sem ``seed`` compartilham uma unica matriz aleatoria
+    por configuracao.
+    ``workers`` e ``mp_context`` so definem como a matriz e calculada.
+    """
+    adaptive = [ci_half_width, confidence, max_games_per_combo] if ci_half_width is not None else None
+    key = ["probability_matrix", players_count, games_per_combo, seed, adaptive, code_version()]
+    if paired:
+        key.append("paired")
+    records = MATRIX_CACHE.get_or_compute(
+        key,
+        lambda: compute_probability_matrix(
+            players_count, games_per_combo=games_per_combo, seed=seed, progress=progress,
+            ci_half_width=ci_half_width, confidence=confidence,
+            max_games_per_combo=max_games_per_combo, paired=paired, workers=workers,
+            mp_context=mp_context,
+        ).to_dict(orient="records"),
+    )
+    table = Table(records)
+    return table.as_frame() if as_frame else table
+
+
+def _scalar_games(players_count, games, seed, log_level, characters=None, timer=None, store=None,
+                  known=None):
+    """Gera ``(semente, vencedor, jogadores, rodada_eq, rodada_quebra, log)`` por partida.
+
+    Cada partida tem seu proprio ``EventLog``; com ``log_level=None`` apenas
+    o resumo e registrado (para as rodadas de equilibrio) e o log volta vazio.
+    Partidas presentes em ``known`` (``{semente: partida}``, de
+    ``ResultStore.lookup``) nao sao simuladas de novo; as simuladas sao
+    gravadas em ``store``.
+    """
+    deck = Deck()
     for i in range(games):
-        winner, players, log = simulate_game(
-            players_count, return_log=True, game_number=i + 1
+        game_seed = derive_seed(seed, i)
+        if known and game_seed in known:
+            yield (game_seed,) + known[game_seed] + ([],)
+            continue
+        log = EventLog(SUMMARY if log_level is None else log_level)
+        winner, players = simulate_game(
+            players_count, characters, game_number=i + 1, seed=game_seed, log=log,
+            timer=timer, deck=deck,
         )
-        logs.extend(log)
+        eq_round, break_round = log.nash_rounds(i + 1)
+        entries = log.to_dicts() if log_level is not None else []
+        seats = [(p.character, p.role, p.alive) for p in players]
+        if store is not None:
+            store.record(
+                "scalar", players_count, game_seed, seats, winner, log.end_rounds[i + 1],
+                eq_round, break_round,
+            )
+        yield game_seed, winner, seats, eq_round, break_round, entries
+
+
+def _batch_games(players_count, games, seed, characters=None):
+    """Mesmo formato de ``_scalar_games`` usando o motor vetorizado (sem log nem semente)."""
+    from batch_engine import ROLE_NAMES, WINNER_NAMES, simulate_batch
+
+    if not games:
+        return
+    result = simulate_batch(players_count, games, characters, seed=derive_seed(seed, "batch"))
+    for g in range(games):
+        seats = [
+            (CHARACTERS[c], ROLE_NAMES[r], bool(a))
+            for c, r, a in zip(result["characters"][g], result["roles"][g], result["alive"][g])
+        ]
+        winner = WINNER_NAMES[result["winner"][g]]
+        eq_round = int(result["equilibrium_round"][g]) or None
+        break_round = int(result["break_round"][g]) or None
+        yield None, winner, seats, eq_round, break_round, []
+
+
+def iter_statistics(players_count=4, games=500, seed=None, engine="scalar",
+                    include_matrix=False, matrix_games=50, log_level=HANDS, characters=None,
+                    timer=None, store=None):
+    """Gera um registro por partida e, no final, as estatisticas agregadas.
+
+    Os registros de partida (``"type": "game"``) trazem a semente da
+    partida (``None`` no motor vetorizado), vencedor, rodadas de equilibrio
+    e o log da partida; o ultimo registro (``"type": "summary"``)
+    traz as tabelas agregadas. Apenas contadores sao mantidos entre as
+    partidas, entao a memoria nao cresce com ``games``. Os parametros sao os
+    de ``compute_statistics``.
+    """
+    if engine not in ("scalar", "batch"):
+        raise ValueError(f"Motor invalido: {engine}")
+    matrix_seed = seed
+    if seed is None:
+        seed = new_seed()
+
+    results_roles = {"Sheriff": 0, "Outlaws": 0, "Renegade": 0, "Draw": 0}
+    results_details = {}
+
+    # Partidas com personagens fixos nao sao setups aleatorios, partidas
+    # guardadas nao tem log e as do motor vetorizado nao tem semente (seriam
+    # guardadas de novo a cada execucao); nenhum desses casos usa o
+    # armazenamento.
+    if characters is not None or engine == "batch":
+        store = None
+    reused, known = [], None
+    if store is not None and log_level is None:
+        if matrix_seed is None:
+            reused = store.sample(players_count, games)
+        else:
+            known = store.lookup(players_count, [derive_seed(seed, i) for i in range(games)])
+
+    simulated = games - len(reused)
+    if engine == "batch":
+        outcomes = _batch_games(players_count, simulated, seed, characters)
+    else:
+        outcomes = _scalar_games(players_count, simulated, seed, log_level, characters, timer, store, known)
+    outcomes = itertools.chain((game + ([],) for game in reused), outcomes)
+
+    for i, (game_seed, winner, seats, eq_round, break_round, entries) in enumerate(outcomes):
         results_roles[winner] += 1
 
-        winners_chars = [
-            p["character"]
-            for p in players
-            if p["alive"] and (
-                (winner == "Outlaws" and p["role"] == "Outlaw")
-                or (winner == "Sheriff" and p["role"] in ["Sheriff", "Deputy"])
-                or (winner == "Renegade" and p["role"] == "Renegade")
-            )
+        winners = [
+            (character, role, alive)
+            for character, role, alive in seats
+            if (winner == "Outlaws" and role == "Outlaw")
+            or (winner == "Sheriff" and role in ["Sheriff", "Deputy"])
+            or (winner == "Renegade" and role == "Renegade")
         ]
-        eq_round = next((e["round"] for e in log if e.get("action") == "nash_equilibrium"), None)
-        break_round = next((e["round"] for e in log if e.get("action") == "nash_equilibrium_broken"), None)
-        game_results.append({
+        for character, role, _ in winners:
+            key = (character, role)
+            results_details[key] = results_details.get(key, 0) + 1
+
+        yield {
+            "type": "game",
             "game": i + 1,
+            "seed": game_seed,
             "winner_role": winner,
-            "winner_characters": winners_chars,
-        })
-        nash_list.append({
-            "game": i + 1,
+            "winner_characters": [character for character, _, alive in winners if alive],
             "equilibrium_round": eq_round,
             "break_round": break_round,
-        })
-
-        if winner != "Draw":
-            for p in players:
-                if winner == "Outlaws" and p["role"] != "Outlaw":
-                    continue
-                if winner == "Sheriff" and p["role"] not in ["Sheriff", "Deputy"]:
-                    continue
-                if winner == "Renegade" and p["role"] != "Renegade":
-                    continue
-                key = (p["character"], p["role"])
-                results_details[key] = results_details.get(key, 0) + 1
-
-    df_roles = pd.DataFrame.from_dict(results_roles, orient="index", columns=["Wins"])
-    df_roles["Win Rate (%)"] = df_roles["Wins"] / games * 100
-    df_roles.index.name = "Role"
-    df_roles = df_roles.reset_index()
+            "log": entries,
+        }
+    if store is not None:
+        store.flush()
 
+    role_stats = [
+        {"Role": role, "Wins": wins, "Win Rate (%)": wins / games * 100 if games else math.nan}
+        for role, wins in results_roles.items()
+    ]
     details_rows = [
         {"Character": k[0], "Role": k[1], "Win Rate (%)": v / games * 100}
         for k, v in results_details.items()
     ]
-    df_details = pd.DataFrame(details_rows)
-    if not df_details.empty:
-        df_details = (
-            df_details.pivot_table(index="Character", columns="Role", values="Win Rate (%)")
-            .reset_index()
-            .fillna(0)
-        )
 
-    prob = compute_probability_matrix(players_count, games_per_combo=50)
-    prob = prob.pivot_table(index="Character", columns="Role", values=["Win %", "Loss %"])
-    prob.columns = [f"{stat} {role}" for stat, role in prob.columns]
-    prob = prob.reset_index().fillna(0)
+    summary = {
+        "type": "summary",
+        "games": games,
+        "role_stats": role_stats,
+        "role_character_stats": pivot(details_rows, "Character", "Role", "Win Rate (%)").to_dict(),
+    }
+    if include_matrix:
+        prob = cached_probability_matrix(players_count, games_per_combo=matrix_games, seed=matrix_seed)
+        summary["probability_matrix"] = pivot(prob, "Character", "Role", ["Win %", "Loss %"]).to_dict()
+    yield summary
+
+
+def compute_statistics(players_count=4, games=500, seed=None, engine="scalar",
+                       include_matrix=False, matrix_games=50, log_level=HANDS, characters=None,
+                       progress=None, timer=None, store=None):
+    """Executa multiplas partidas e retorna estatisticas e log completo.
+
+    A partida ``i`` usa a semente ``derive_seed(seed, i)``. Com
+    ``engine="batch"`` (experimental, apenas as regras padrao) as partidas
+    rodam juntas em ``batch_engine`` e o log de eventos fica vazio. A matriz de probabilidades so e incluida com
+    ``include_matrix=True`` e vem de ``cached_probability_matrix`` usando a
+    ``seed`` informada pelo chamador. ``log_level`` (``events.SUMMARY``,
+    ``EVENTS``, ``HANDS`` ou ``None`` para nenhum log) define o detalhe do
+    log retornado. ``characters`` fixa os personagens de todas as partidas e
+    ``progress(concluidas, total)`` e chamado ao fim de cada partida e
+    ``timer`` (``metrics.PhaseTimer``) mede as fases das partidas escalares.
+
+    Com ``store`` (um ``store.ResultStore``) as partidas simuladas sao
+    gravadas e, quando ``log_level=None`` e ``characters`` nao e informado,
+    reaproveitadas: com ``seed`` as partidas com as mesmas sementes ja
+    guardadas nao sao simuladas de novo; sem ``seed`` as partidas guardadas
+    da configuracao sao usadas primeiro e apenas o restante e simulado.
+
+    Cada item de ``game_results`` traz a ``seed`` da partida: com ela (e os
+    mesmos ``players_count`` e ``characters``) ``replay_game`` refaz a
+    partida e o seu log, que entao nao precisa ser guardado.
+    """
+    logs = []
+    game_results = []
+    nash_list = []
+    for record in iter_statistics(
+        players_count, games, seed, engine, include_matrix, matrix_games, log_level, characters,
+        timer, store,
+    ):
+        if record["type"] == "summary":
+            result = {k: v for k, v in record.items() if k not in ("type", "games")}
+            continue
+        logs.extend(record["log"])
+        if progress is not None:
+            progress(record["game"], games)
+        game_results.append({
+            "game": record["game"],
+            "seed": record["seed"],
+            "winner_role": record["winner_role"],
+            "winner_characters": record["winner_characters"],
+        })
+        nash_list.append({
+            "game": record["game"],
+            "equilibrium_round": record["equilibrium_round"],
+            "break_round": record["break_round"],
+        })
 
-    return {
-        "role_stats": df_roles.to_dict(orient="records"),
-        "role_character_stats": df_details.to_dict(orient="records") if not df_details.empty else [],
-        "probability_matrix": prob.to_dict(orient="records"),
+    result.update({
         "log": logs,
         "game_results": game_results,
         "nash_equilibria": nash_list,
-    }
+    })
+    return result
 
-def simulate_game(players_count=4, characters=None, rounds=500, roles=None, return_log=False, game_number=1):
-    """Simula uma partida e retorna o time vencedor e os jogadores.
 
-    Quando ``return_log`` é ``True`` uma lista de eventos da partida é
-    retornada como terceiro elemento da tupla.
+def replay_game(players_count, seed, characters=None, roles=None, game_number=1, log_level=HANDS,
+                config=None):
+    """Simula de novo uma partida a partir das entradas registradas.
+
+    Cada partida usa apenas o seu proprio gerador, criado de ``seed``, entao
+    com os mesmos ``players_count``, ``characters``, ``roles`` e ``config``
+    a partida e o log sao identicos aos originais. Retorna ``(vencedor,
+    jogadores, log)`` com um ``EventLog`` de nivel ``log_level``.
     """
+    log = EventLog(log_level)
+    winner, players = simulate_game(
+        players_count, characters, roles=roles, game_number=game_number, seed=seed, log=log,
+        config=config,
+    )
+    return winner, players, log
+
+def simulate_game(players_count=4, characters=None, rounds=None, roles=None, return_log=False, game_number=1,
+                  rng=None, seed=None, log=None, legacy_victory=False, timer=None, deck=None, config=None):
+    """Simula uma partida e retorna o time vencedor e os jogadores.
+
+    Quando ``return_log`` é ``True`` um ``events.EventLog`` com os eventos da
+    partida é retornado como terceiro elemento da tupla. Um ``log`` ja
+    existente pode ser passado para acumular varias partidas no mesmo
+    registro (e escolher seu nivel de detalhe).
+
+    Os jogadores sao objetos ``state.Player``; ``player.as_dict()`` devolve o
+    formato em dicionario usado pela API.
 
-    log = [] if return_log else None
+    Toda a aleatoriedade da partida vem de ``rng`` (um ``random.Random``).
+    Se ele nao for informado, um gerador novo e criado a partir de ``seed``
+    (ou de uma semente sorteada por ``new_seed``).
 
-    roles = roles if roles is not None else get_roles(players_count)
+    A vitoria e detectada logo apos a morte que decide a partida. Com
+    ``legacy_victory=True`` ela so e verificada no fim de cada rodada, como
+    nas versoes anteriores.
+
+    ``timer`` (um ``metrics.PhaseTimer``) acumula o tempo gasto em cada fase
+    do turno e em cada habilidade; sem ele nada e medido. Um ``utils.Deck``
+    passado em ``deck`` e reiniciado e reaproveitado em vez de criar outro.
+
+    ``config`` (um ``config.SimulationConfig``) define as regras ajustaveis:
+    limite de rodadas, chance de explosao da DYNAMITE, vida em que a BEER e
+    usada, composicao do baralho e personagens sorteaveis. ``rounds``, se
+    informado, tem precedencia sobre ``config.rounds``.
+    """
+
+    config = config or DEFAULT_CONFIG
+    if rounds is None:
+        rounds = config.rounds
+    perks = CHARACTER_PERKS
+    if timer is not None:
+        timer.start()
+        perks = timer.wrap_perks(CHARACTER_PERKS)
+    if log is None and return_log:
+        log = EventLog()
+    log_turns = log is not None and log.keep_turns
+    game_seed = None
+    if rng is None:
+        game_seed = seed if seed is not None else new_seed()
+        rng = random.Random(game_seed)
+
+    drawn = (roles is None, characters is None)
+    roles = roles if roles is not None else get_roles(players_count, rng)
     if len(roles) != players_count:
         raise ValueError("Numero de funcoes diferente do numero de jogadores.")
 
@@ -204,37 +686,33 @@ def simulate_game(players_count=4, characters=None, rounds=500, roles=None, retu
             if c not in CHARACTERS:
                 raise ValueError(f"Personagem invalido: {c}")
     else:
-        characters = random.sample(CHARACTERS, players_count)
+        characters = rng.sample(config.characters(), players_count)
+
+    # Habilidades por evento e assento (``None`` quando o personagem ignora
+    # o evento), para nao chamar habilidades que nao fazem nada.
+    hooks = perk_hooks(characters, perks)
+    on_turn_start = hooks["turn_start"]
+    on_damaged = hooks["damaged"]
+    on_draw_phase = hooks["draw_phase"]
+    on_draw = hooks["draw"]
+    on_hit = hooks["damaged_by_player"]
+    on_turn_end = hooks["turn_end"]
 
     players = []
     for i in range(players_count):
         base_hp = 5 if roles[i] == "Sheriff" else 4
-        p = {
-            "id": i,
-            "role": roles[i],
-            "character": characters[i],
-            "hp": base_hp,
-            "max_hp": base_hp,
-            "alive": True,
-            "hand": [],
-            "weapon": "BASIC",
-            "range_bonus": 0,
-            "dodge_bonus": 0
-        }
-        CHARACTER_PERKS[characters[i]](p, "start")
+        p = Player(i, roles[i], characters[i], base_hp)
+        if hooks["start"][i] is not None:
+            hooks["start"][i](p, "start")
         players.append(p)
 
-    if return_log:
-        log.append({
-            "game": game_number,
-            "action": "setup",
-            "players": [
-                {"character": p["character"], "role": p["role"]} for p in players
-            ],
-        })
+    if log is not None:
+        log.setup(game_number, players, game_seed, drawn)
 
-    deck = build_deck()
-    discard = []
+    if deck is None or deck.counts != config.deck_counts:
+        deck = Deck(config.deck_counts)
+    deck.reset(rng)
+    discard = deck.discards
     dynamite_owner = None
 
     equilibrium_round = None
@@ -243,66 +721,82 @@ def simulate_game(players_count=4, characters=None, rounds=500, roles=None, retu
 
     for p in players:
         for _ in range(2):
-            card = draw_card(deck, discard)
+            card = draw_card(deck, discard, rng)
             if card:
-                p["hand"].append(card)
+                p.hand.append(card)
+
+    alive = AliveCounts(players)
+    targeting = TargetingIndex(players)
+    beer_threshold = config.beer_threshold
+    if timer is not None:
+        timer.lap("setup")
+
+    def finish(winner, round_number):
+        if timer is not None:
+            timer.games += 1
+        if log is not None:
+            log.game_end(game_number, round_number, winner)
+        if return_log:
+            return winner, players, log
+        return winner, players
 
     for round_ in range(rounds):
-        outlaws_alive_cnt = sum(1 for p in players if p["alive"] and p["role"] == "Outlaw")
-        law_alive_cnt = sum(
-            1
-            for p in players
-            if p["alive"] and p["role"] in ["Sheriff", "Deputy"]
-        )
-
-        if outlaws_alive_cnt == law_alive_cnt:
+        if alive.outlaw == alive.law:
             if not in_equilibrium:
                 in_equilibrium = True
                 equilibrium_round = round_ + 1
-                if return_log:
-                    log.append({"game": game_number, "round": round_ + 1, "action": "nash_equilibrium"})
+                if log is not None:
+                    log.equilibrium(game_number, round_ + 1)
         else:
             if in_equilibrium:
                 in_equilibrium = False
                 equilibrium_broken_round = round_ + 1
-                if return_log:
-                    log.append({"game": game_number, "round": round_ + 1, "action": "nash_equilibrium_broken"})
+                if log is not None:
+                    log.equilibrium(game_number, round_ + 1, broken=True)
 
         for player in players:
-            if not player["alive"]:
+            if not player.alive:
                 continue
-            if return_log:
-                log.append({
-                    "game": game_number,
-                    "round": round_ + 1,
-                    "player": player["character"],
-                    "role": player["role"],
-                    "action": "turn_start",
-                    "hand": player["hand"].copy(),
-                })
+            if log_turns:
+                log.event(TURN_START, game_number, round_ + 1, player.id, hand=player.hand)
 
             # habilidades no inicio do turno
-            CHARACTER_PERKS[player["character"]](player, "turn_start", discard=discard)
+            seat = player.id
+            if on_turn_start[seat] is not None:
+                on_turn_start[seat](player, "turn_start", discard=discard, rng=rng)
+            if timer is not None:
+                timer.lap("turn_start")
 
             # Dynamite
             if dynamite_owner == player:
-                if random.random() < DYNAMITE_EXPLOSION_PROB:
+                if rng.random() < config.dynamite_explosion_prob:
                     for _ in range(3):
-                        player["hp"] -= 1
-                        CHARACTER_PERKS[player["character"]](player, "damaged", deck=deck, discard=discard)
-                        if player["hp"] <= 0:
-                            player["alive"] = False
+                        player.hp -= 1
+                        if on_damaged[seat] is not None:
+                            on_damaged[seat](player, "damaged", deck=deck, discard=discard, rng=rng)
+                        if player.hp <= 0:
+                            alive.kill(player)
+                            targeting.died(player)
                             break
                     dynamite_owner = None
+                    if not legacy_victory:
+                        winner = alive.winner()
+                        if winner:
+                            return finish(winner, round_ + 1)
+            if timer is not None:
+                timer.lap("dynamite")
 
             # Compra
-            handled = CHARACTER_PERKS[player["character"]](
-                player,
-                "draw_phase",
-                players=players,
-                deck=deck,
-                discard=discard,
-            )
+            handled = False
+            if on_draw_phase[seat] is not None:
+                handled = on_draw_phase[seat](
+                    player,
+                    "draw_phase",
+                    players=players,
+                    deck=deck,
+                    discard=discard,
+                    rng=rng,
+                )
             draw_cards = 2
             if handled:
                 if handled == "skip":
@@ -310,252 +804,138 @@ def simulate_game(players_count=4, characters=None, rounds=500, roles=None, retu
                 else:
                     draw_cards -= 1
             for _ in range(draw_cards):
-                if player["character"] == "Lucky Duke":
-                    CHARACTER_PERKS[player["character"]](player, "draw", deck=deck, discard=discard)
+                if on_draw[seat] is not None:
+                    on_draw[seat](player, "draw", deck=deck, discard=discard, rng=rng)
                 else:
-                    card = draw_card(deck, discard)
+                    card = draw_card(deck, discard, rng)
                     if card:
-                        player["hand"].append(card)
-            if return_log:
-                log.append({
-                    "game": game_number,
-                    "round": round_ + 1,
-                    "player": player["character"],
-                    "role": player["role"],
-                    "action": "draw",
-                    "hand": player["hand"].copy(),
-                })
-
-            # Equipamento
-            for card in player["hand"][:]:
-                if card in WEAPON_RANGES:
-                    player["weapon"] = card
-                    player["hand"].remove(card)
-                    discard.append(card)
-                    if return_log:
-                        log.append({
-                            "game": game_number,
-                            "round": round_ + 1,
-                            "player": player["character"],
-                            "role": player["role"],
-                            "action": "equip",
-                            "card": card,
-                            "hand": player["hand"].copy(),
-                        })
-                elif card == "SCOPE":
-                    player["range_bonus"] += 1
-                    player["hand"].remove(card)
-                    discard.append(card)
-                    if return_log:
-                        log.append({
-                            "game": game_number,
-                            "round": round_ + 1,
-                            "player": player["character"],
-                            "role": player["role"],
-                            "action": "equip",
-                            "card": card,
-                            "hand": player["hand"].copy(),
-                        })
-                elif card == "MUSTANG":
-                    player["dodge_bonus"] += 1
-                    player["hand"].remove(card)
+                        player.hand.append(card)
+            if log_turns:
+                log.event(DRAW, game_number, round_ + 1, player.id, hand=player.hand)
+            if timer is not None:
+                timer.lap("draw")
+
+            # Equipamento, na ordem em que as cartas entraram na mao
+            hand_counts = player.hand.counts
+            if any(hand_counts[card_id] for card_id in EQUIPMENT_IDS):
+                for card_id in player.hand.ids():
+                    if card_id not in EQUIPMENT_IDS:
+                        continue
+                    card = CARD_NAMES[card_id]
+                    if card_id == SCOPE:
+                        player.range_bonus += 1
+                    elif card_id == MUSTANG:
+                        player.dodge_bonus += 1
+                    else:
+                        player.weapon = card
+                    hand_counts[card_id] -= 1
+                    player.hand.size -= 1
                     discard.append(card)
-                    if return_log:
-                        log.append({
-                            "game": game_number,
-                            "round": round_ + 1,
-                            "player": player["character"],
-                            "role": player["role"],
-                            "action": "equip",
-                            "card": card,
-                            "hand": player["hand"].copy(),
-                        })
+                    targeting.equipped(player, card)
+                    if log_turns:
+                        log.event(EQUIP, game_number, round_ + 1, player.id, card=card_id, hand=player.hand)
+            if timer is not None:
+                timer.lap("equip")
 
             # Beer
-            if player["hp"] <= 2 and "BEER" in player["hand"]:
-                player["hp"] += 1
-                player["hand"].remove("BEER")
+            if player.hp <= beer_threshold and hand_counts[BEER]:
+                player.hp += 1
+                hand_counts[BEER] -= 1
+                player.hand.size -= 1
                 discard.append("BEER")
-                if return_log:
-                    log.append({
-                        "game": game_number,
-                        "round": round_ + 1,
-                        "player": player["character"],
-                        "role": player["role"],
-                        "action": "beer",
-                        "hand": player["hand"].copy(),
-                        "new_hp": player["hp"],
-                    })
+                if log_turns:
+                    log.event(BEER_EVENT, game_number, round_ + 1, player.id, hp=player.hp, hand=player.hand)
+            if timer is not None:
+                timer.lap("beer")
 
             # Ataques
-            shots = 2 if WEAPON_RANGES.get(player["weapon"], {}).get("multi_shot") else 1
-            if player.get("unlimited_bang"):
-                shots = player["hand"].count("BANG")
-                if player.get("can_use_missed_as_bang"):
-                    shots += player["hand"].count("MISSED")
+            shots = 2 if WEAPON_RANGES.get(player.weapon, {}).get("multi_shot") else 1
+            if player.unlimited_bang:
+                shots = hand_counts[BANG]
+                if player.can_use_missed_as_bang:
+                    shots += hand_counts[MISSED]
             for _ in range(shots):
-                if "BANG" in player["hand"]:
-                    use_card = "BANG"
-                elif player.get("can_use_missed_as_bang") and "MISSED" in player["hand"]:
-                    use_card = "MISSED"
+                if hand_counts[BANG]:
+                    use_card, use_id = "BANG", BANG
+                elif player.can_use_missed_as_bang and hand_counts[MISSED]:
+                    use_card, use_id = "MISSED", MISSED
                 else:
                     break
 
-                target = select_target(player, players)
+                target = select_target(player, players, rng, alive, targeting)
                 if not target:
                     continue
-                if return_log:
-                    log.append({
-                        "game": game_number,
-                        "round": round_ + 1,
-                        "player": player["character"],
-                        "role": player["role"],
-                        "action": "attack",
-                        "card": use_card,
-                        "target": target["character"],
-                        "hand": player["hand"].copy(),
-                    })
-                player["hand"].remove(use_card)
+                if log_turns:
+                    log.event(
+                        ATTACK, game_number, round_ + 1, player.id,
+                        card=use_id, target=target.id, hand=player.hand,
+                    )
+                hand_counts[use_id] -= 1
+                player.hand.size -= 1
                 discard.append(use_card)
 
-                misses_needed = 2 if player["character"] == "Slab the Killer" else 1
+                misses_needed = player.misses_needed
                 used_misses = 0
+                target_hand = target.hand
+                target_counts = target_hand.counts
                 while used_misses < misses_needed:
-                    if "MISSED" in target["hand"]:
-                        target["hand"].remove("MISSED")
+                    if target_counts[MISSED]:
+                        target_counts[MISSED] -= 1
+                        target_hand.size -= 1
                         discard.append("MISSED")
                         used_misses += 1
-                    elif target.get("can_use_bang_as_missed") and "BANG" in target["hand"]:
-                        target["hand"].remove("BANG")
+                    elif target.can_use_bang_as_missed and target_counts[BANG]:
+                        target_counts[BANG] -= 1
+                        target_hand.size -= 1
                         discard.append("BANG")
                         used_misses += 1
                     else:
                         break
 
                 if used_misses < misses_needed:
-                    target["hp"] -= 1
-                    if return_log:
-                        log.append({
-                            "game": game_number,
-                            "round": round_ + 1,
-                            "player": target["character"],
-                            "role": target["role"],
-                            "action": "damaged",
-                            "new_hp": target["hp"],
-                            "hand": target["hand"].copy(),
-                        })
-                    if target["character"] == "Bart Cassidy":
-                        CHARACTER_PERKS[target["character"]](target, "damaged", deck=deck, discard=discard)
-                    if target["character"] == "El Gringo":
-                        CHARACTER_PERKS[target["character"]](target, "damaged_by_player", attacker=player)
-                    if target["hp"] <= 0:
-                        target["alive"] = False
-                        if return_log:
-                            log.append({
-                                "game": game_number,
-                                "round": round_ + 1,
-                                "player": target["character"],
-                                "role": target["role"],
-                                "action": "death",
-                            })
+                    target.hp -= 1
+                    if log_turns:
+                        log.event(DAMAGED, game_number, round_ + 1, target.id, hp=target.hp, hand=target.hand)
+                    if on_damaged[target.id] is not None:
+                        on_damaged[target.id](target, "damaged", deck=deck, discard=discard, rng=rng)
+                    if on_hit[target.id] is not None:
+                        on_hit[target.id](target, "damaged_by_player", attacker=player, rng=rng)
+                    if target.hp <= 0:
+                        alive.kill(target)
+                        targeting.died(target)
+                        if log is not None:
+                            log.event(DEATH, game_number, round_ + 1, target.id)
+                        if not legacy_victory:
+                            winner = alive.winner()
+                            if winner:
+                                return finish(winner, round_ + 1)
+
+            if timer is not None:
+                timer.lap("attack")
 
             # Limite de cartas
-            while len(player["hand"]) > player["hp"]:
-                discard.append(player["hand"].pop())
-
-            CHARACTER_PERKS[player["character"]](
-                player, "turn_end", deck=deck, discard=discard
-            )
-            if return_log:
-                log.append({
-                    "game": game_number,
-                    "round": round_ + 1,
-                    "player": player["character"],
-                    "role": player["role"],
-                    "action": "turn_end",
-                    "hand": player["hand"].copy(),
-                })
+            while player.hand.size > player.hp:
+                discard.append(player.hand.pop())
+            if timer is not None:
+                timer.lap("hand_limit")
+
+            if on_turn_end[seat] is not None:
+                on_turn_end[seat](player, "turn_end", deck=deck, discard=discard, rng=rng)
+            if log_turns:
+                log.event(TURN_END, game_number, round_ + 1, player.id, hand=player.hand)
+            if timer is not None:
+                timer.lap("turn_end")
 
         # Verificação de vitória
-        sheriff_alive = any(p["role"] == "Sheriff" and p["alive"] for p in players)
-        outlaws_alive = any(p["role"] == "Outlaw" and p["alive"] for p in players)
-        renegade_alive = any(p["role"] == "Renegade" and p["alive"] for p in players)
-
-        winner = None
-        if not sheriff_alive and not outlaws_alive and renegade_alive:
-            winner = "Renegade"
-        elif sheriff_alive and not outlaws_alive and not renegade_alive:
-            winner = "Sheriff"
-        elif not sheriff_alive and outlaws_alive:
-            winner = "Outlaws"
-
+        winner = alive.winner()
         if winner:
-            if return_log:
-                log.append({
-                    "game": game_number,
-                    "action": "game_end",
-                    "winner": winner,
-                })
-                return winner, players, log
-            return winner, players
+            return finish(winner, round_ + 1)
 
-    if return_log:
-        log.append({"game": game_number, "action": "game_end", "winner": "Draw"})
-        return "Draw", players, log
-
-    return "Draw", players
+    return finish("Draw", rounds)
 
 if __name__ == "__main__":
-    import pandas as pd
-    total_games = 5000
-    players_count = int(input("Numero de jogadores (3-7): "))
-    if not 3 <= players_count <= 7:
-        raise ValueError("Numero de jogadores deve estar entre 3 e 7.")
-    print("Personagens disponiveis:")
-    print(", ".join(CHARACTERS))
-    chars_input = input(
-        "Digite os personagens separados por virgula ou pressione Enter para aleatorio: "
-    ).strip()
-    if chars_input:
-        selected_characters = [c.strip() for c in chars_input.split(',')]
-    else:
-        selected_characters = None
+    import sys
 
-    results_roles = {"Sheriff": 0, "Outlaws": 0, "Renegade": 0, "Draw": 0}
-    results_details = {}
-
-    for _ in range(total_games):
-        winner, players = simulate_game(players_count, selected_characters)
-        results_roles[winner] += 1
-
-        if winner != "Draw":
-            for p in players:
-                if winner == "Outlaws" and p["role"] != "Outlaw":
-                    continue
-                if winner == "Sheriff" and p["role"] not in ["Sheriff", "Deputy"]:
-                    continue
-                if winner == "Renegade" and p["role"] != "Renegade":
-                    continue
-                key = (p["role"], p["character"])
-                results_details[key] = results_details.get(key, 0) + 1
-
-    df_roles = pd.DataFrame.from_dict(results_roles, orient="index", columns=["Wins"])
-    df_roles["Win Rate (%)"] = df_roles["Wins"] / total_games * 100
-
-    details_rows = [
-        {"Role": k[0], "Character": k[1], "Wins": v, "Win Rate (%)": v / total_games * 100}
-        for k, v in results_details.items()
-    ]
-    df_details = pd.DataFrame(details_rows)
-
-    print("\nEstatisticas por funcao:")
-    print(df_roles)
-    print("\nEstatisticas por funcao e personagem:")
-    if not df_details.empty:
-        print(df_details.sort_values(["Role", "Character"]).to_string(index=False))
-    else:
-        print("Nenhum dado disponivel")
+    from cli import main_cli
 
-    print("\nMatriz de probabilidades (personagem x funcao):")
-    matrix = compute_probability_matrix(players_count, games_per_combo=50)
-    print(matrix.to_string(index=False))
+    sys.exit(main_cli())
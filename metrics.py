@@ -0,0 +1,166 @@
+"""Opt-in instrumentation for ``simulate_game`` and the service.
+
+``PhaseTimer`` collects cumulative nanoseconds and call counts per phase of
+a turn and per character perk. Pass one to ``simulate_game(timer=...)`` (or
+``compute_statistics``) to enable it; without a timer the game loop only
+pays for a few ``is None`` checks per turn. A single timer can be shared by
+many games to aggregate a batch.
+
+``Registry`` keeps process-wide counters for the service (games simulated,
+simulation time, request latencies and merged phase timings) and renders
+them in the Prometheus text format.
+"""
+import threading
+from time import perf_counter_ns
+
+PHASES = (
+    "setup", "turn_start", "dynamite", "draw", "equip", "beer", "attack",
+    "hand_limit", "turn_end",
+)
+
+
+class PhaseTimer:
+    """Cumulative time and call count per phase and per perk."""
+
+    def __init__(self):
+        self.ns = dict.fromkeys(PHASES, 0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.perk_ns = {}
+        self.perk_calls = {}
+        self.games = 0
+        self._last = 0
+        self._wrapped = {}
+
+    def start(self):
+        """Mark the beginning of the next phase."""
+        self._last = perf_counter_ns()
+
+    def lap(self, phase):
+        """Charge the time since the previous mark to ``phase``."""
+        now = perf_counter_ns()
+        self.ns[phase] += now - self._last
+        self.calls[phase] += 1
+        self._last = now
+
+    def wrap_perks(self, perks):
+        """Return a copy of ``perks`` whose functions record their own time."""
+        wrapped = self._wrapped.get(id(perks))
+        if wrapped is None:
+            wrapped = self._wrapped[id(perks)] = {
+                name: self._timed(name, func) for name, func in perks.items()
+            }
+        return wrapped
+
+    def _timed(self, character, func):
+        def timed(player, event, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(player, event, **kwargs)
+            finally:
+                key = (character, event)
+                self.perk_ns[key] = self.perk_ns.get(key, 0) + perf_counter_ns() - start
+                self.perk_calls[key] = self.perk_calls.get(key, 0) + 1
+        return timed
+
+    def merge(self, other):
+        """Add the totals of ``other`` to this timer."""
+        for phase in PHASES:
+            self.ns[phase] += other.ns[phase]
+            self.calls[phase] += other.calls[phase]
+        for key, ns in other.perk_ns.items():
+            self.perk_ns[key] = self.perk_ns.get(key, 0) + ns
+            self.perk_calls[key] = self.perk_calls.get(key, 0) + other.perk_calls[key]
+        self.games += other.games
+
+    def as_dict(self):
+        return {
+            "games": self.games,
+            "phases": {
+                phase: {"ns": self.ns[phase], "calls": self.calls[phase]} for phase in PHASES
+            },
+            "perks": [
+                {"character": character, "event": event, "ns": ns,
+                 "calls": self.perk_calls[(character, event)]}
+                for (character, event), ns in sorted(self.perk_ns.items())
+            ],
+        }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Registry:
+    """Process-wide service metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.games = 0
+        self.simulation_seconds = 0.0
+        self.requests = {}
+        self.phases = PhaseTimer()
+
+    def record_games(self, games, seconds):
+        with self._lock:
+            self.games += games
+            self.simulation_seconds += seconds
+
+    def record_request(self, endpoint, status, seconds):
+        with self._lock:
+            count, total = self.requests.get((endpoint, status), (0, 0.0))
+            self.requests[(endpoint, status)] = (count + 1, total + seconds)
+
+    def record_timer(self, timer):
+        with self._lock:
+            self.phases.merge(timer)
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            rate = self.games / self.simulation_seconds if self.simulation_seconds else 0.0
+            lines = [
+                "# HELP bang_games_simulated_total Games simulated by this process.",
+                "# TYPE bang_games_simulated_total counter",
+                f"bang_games_simulated_total {self.games}",
+                "# HELP bang_simulation_seconds_total Time spent simulating games.",
+                "# TYPE bang_simulation_seconds_total counter",
+                f"bang_simulation_seconds_total {self.simulation_seconds}",
+                "# HELP bang_games_per_second Average simulation throughput.",
+                "# TYPE bang_games_per_second gauge",
+                f"bang_games_per_second {rate}",
+                "# HELP bang_request_duration_seconds Latency of HTTP requests.",
+                "# TYPE bang_request_duration_seconds summary",
+            ]
+            for (endpoint, status), (count, total) in sorted(self.requests.items()):
+                labels = _labels(endpoint=endpoint, status=status)
+                lines.append(f"bang_request_duration_seconds_count{labels} {count}")
+                lines.append(f"bang_request_duration_seconds_sum{labels} {total}")
+            lines += [
+                "# HELP bang_phase_seconds_total Time spent in each phase of a turn.",
+                "# TYPE bang_phase_seconds_total counter",
+            ]
+            for phase in PHASES:
+                lines.append(f"bang_phase_seconds_total{_labels(phase=phase)} {self.phases.ns[phase] / 1e9}")
+            lines += [
+                "# HELP bang_phase_calls_total Times each phase of a turn ran.",
+                "# TYPE bang_phase_calls_total counter",
+            ]
+            for phase in PHASES:
+                lines.append(f"bang_phase_calls_total{_labels(phase=phase)} {self.phases.calls[phase]}")
+            lines += [
+                "# HELP bang_perk_seconds_total Time spent in character perks.",
+                "# TYPE bang_perk_seconds_total counter",
+            ]
+            for (character, event), ns in sorted(self.phases.perk_ns.items()):
+                lines.append(f"bang_perk_seconds_total{_labels(character=character, event=event)} {ns / 1e9}")
+            lines += [
+                "# HELP bang_perk_calls_total Calls to character perks.",
+                "# TYPE bang_perk_calls_total counter",
+            ]
+            for (character, event), calls in sorted(self.phases.perk_calls.items()):
+                lines.append(f"bang_perk_calls_total{_labels(character=character, event=event)} {calls}")
+        return "\n".join(lines) + "\n"
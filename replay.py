@@ -0,0 +1,419 @@
+"""Compact binary archives of game logs.
+
+An archive stores the games of ``events.EventLog`` objects far more compactly
+than their JSON dicts. Each game starts with a header (game number, seed,
+log level, seats, starting life, winner, rounds and Nash rounds), followed
+by its events. Characters, roles and cards are stored as small integers,
+rounds as deltas and hands as sparse ``(card, count)`` lists.
+
+Games are grouped in blocks of ``block_games`` games, and each block is
+compressed on its own with ``zlib``, with ``zstd`` (when ``zstandard`` is
+installed) or not at all (``"none"``). An index of block offsets at the end
+of the file lets ``ReplayArchive`` memory-map the file and decode only the
+block holding the requested game::
+
+    with ReplayWriter("games.bangr") as writer:
+        for i in range(1000):
+            log = EventLog()
+            simulate_game(5, seed=derive_seed(1, i), game_number=i + 1, log=log)
+            writer.add(log)
+
+    with ReplayArchive("games.bangr") as archive:
+        game = archive[417]
+        game.to_dicts()          # the same dicts as log.to_dicts()
+        game.state_at(12)        # the players after round 12, replayed from the seed
+
+File layout (little endian)::
+
+    magic "BANGRPL1" | codec byte | varint length + JSON name tables
+    block*           | index: (offset u64, length u32) per block
+    footer: index offset u64, games u64, block_games u32, magic
+"""
+import json
+import mmap
+import struct
+import zlib
+from array import array
+
+from events import BEER, DAMAGED, EventLog
+from store import ROLES, WINNERS
+from utils import CARD_NAMES, CHARACTERS
+
+MAGIC = b"BANGRPL1"
+CODECS = ("none", "zlib", "zstd")
+_FOOTER = struct.Struct("<QQI8s")
+_INDEX = struct.Struct("<QI")
+
+# Bits of the first byte of an event, after the action in the low 4 bits.
+_HAS_PLAYER, _HAS_CARD, _HAS_TARGET, _HAS_HAND = 0x10, 0x20, 0x40, 0x80
+# Bits of the setup flags: roles / characters drawn from the seed.
+_ROLES_DRAWN, _CHARACTERS_DRAWN = 0x01, 0x02
+_HAND_SIZE = len(CARD_NAMES)
+
+
+def _compressor(codec):
+    """Return ``(compress, decompress)`` for ``codec``."""
+    if codec == "none":
+        return bytes, bytes
+    if codec == "zlib":
+        return (lambda data: zlib.compress(data, 6)), zlib.decompress
+    if codec == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("codec zstd needs the zstandard package installed") from None
+        return zstandard.ZstdCompressor(level=10).compress, zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def _put(out, value):
+    """Append ``value`` (a non-negative int) to ``out`` as a LEB128 varint."""
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class _Reader:
+    """Cursor over a bytes-like buffer."""
+
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def byte(self):
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def varint(self):
+        data = self.data
+        pos = self.pos
+        value = shift = 0
+        while True:
+            b = data[pos]
+            pos += 1
+            value |= (b & 0x7F) << shift
+            if b < 0x80:
+                self.pos = pos
+                return value
+            shift += 7
+
+
+def _encode_game(log, game, indexes, characters):
+    """Encode game ``game`` of ``log``, whose events are at ``indexes``."""
+    out = bytearray()
+    seed = log.seeds.get(game)
+    roles_drawn, characters_drawn = log.drawn.get(game, (True, True))
+    seats = log.setups[game]
+    eq_round, break_round = log.nash_rounds(game)
+    _put(out, game)
+    _put(out, 0 if seed is None else _zigzag(seed) + 1)
+    out.append(roles_drawn * _ROLES_DRAWN | characters_drawn * _CHARACTERS_DRAWN)
+    out.append(log.level)
+    out.append(len(seats))
+    start_hp = log.start_hp.get(game) or [0] * len(seats)
+    for (character, role), hp in zip(seats, start_hp):
+        out.append(characters[character])
+        out.append(ROLES.index(role))
+        _put(out, _zigzag(hp))
+    out.append(WINNERS.index(log.winners[game]) if game in log.winners else 0xFF)
+    _put(out, log.end_rounds.get(game, 0))
+    _put(out, 0 if eq_round is None else eq_round + 1)
+    _put(out, 0 if break_round is None else break_round + 1)
+
+    _put(out, len(indexes))
+    actions, rounds, hands = log.action, log.round, log.hands
+    players, cards, targets, hps, hand_at = log.player, log.card, log.target, log.hp, log.hand_at
+    last_round = 0
+    for i in indexes:
+        action = actions[i]
+        player, card, target, start = players[i], cards[i], targets[i], hand_at[i]
+        head = action
+        if player >= 0:
+            head |= _HAS_PLAYER
+        if card >= 0:
+            head |= _HAS_CARD
+        if target >= 0:
+            head |= _HAS_TARGET
+        if start >= 0:
+            head |= _HAS_HAND
+        out.append(head)
+        _put(out, _zigzag(rounds[i] - last_round))
+        last_round = rounds[i]
+        if player >= 0:
+            out.append(player)
+        if card >= 0:
+            out.append(card)
+        if target >= 0:
+            out.append(target)
+        if action == BEER or action == DAMAGED:
+            _put(out, _zigzag(hps[i]))
+        if start >= 0:
+            counts = hands[start:start + _HAND_SIZE]
+            held = [(card_id, n) for card_id, n in enumerate(counts) if n]
+            out.append(len(held))
+            for card_id, n in held:
+                out.append(card_id)
+                _put(out, n)
+    return bytes(out)
+
+
+class ReplayWriter:
+    """Append the games of event logs to a replay archive at ``path``.
+
+    Blocks are written as they fill, so memory stays bounded by
+    ``block_games`` encoded games. The archive is only readable after
+    ``close()`` writes the index.
+    """
+
+    def __init__(self, path, codec="zlib", block_games=256):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        if block_games < 1:
+            raise ValueError("block_games must be positive")
+        self._compress = _compressor(codec)[0]
+        self.block_games = block_games
+        self.games = 0
+        self._characters = {name: i for i, name in enumerate(CHARACTERS)}
+        self._pending = []
+        self._index = []
+        self._fh = open(path, "wb")
+        names = json.dumps({"characters": list(CHARACTERS), "cards": list(CARD_NAMES)}).encode()
+        head = bytearray(MAGIC)
+        head.append(CODECS.index(codec))
+        _put(head, len(names))
+        self._fh.write(bytes(head) + names)
+
+    def add(self, log, game=None):
+        """Add game ``game`` of ``log`` (every game of ``log`` by default)."""
+        events = {}
+        for i, number in enumerate(log.game):
+            if game is None or number == game:
+                events.setdefault(number, []).append(i)
+        if game is not None and game not in log.setups:
+            raise KeyError(game)
+        for number in log.setups if game is None else [game]:
+            self._pending.append(_encode_game(log, number, events.get(number, []), self._characters))
+            self.games += 1
+            if len(self._pending) == self.block_games:
+                self._write_block()
+
+    def _write_block(self):
+        table = bytearray()
+        _put(table, len(self._pending))
+        for data in self._pending:
+            _put(table, len(data))
+        block = self._compress(bytes(table) + b"".join(self._pending))
+        self._index.append((self._fh.tell(), len(block)))
+        self._fh.write(block)
+        self._pending = []
+
+    def close(self):
+        if self._fh.closed:
+            return
+        if self._pending:
+            self._write_block()
+        index_at = self._fh.tell()
+        for offset, length in self._index:
+            self._fh.write(_INDEX.pack(offset, length))
+        self._fh.write(_FOOTER.pack(index_at, self.games, self.block_games, MAGIC))
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameReplay:
+    """One archived game: header fields plus events decoded on demand.
+
+    ``seats`` lists ``(character, role)`` per seat and ``start_hp`` their
+    life after the setup. ``to_log()`` rebuilds an ``EventLog`` with just
+    this game, so ``to_dicts()``/``iter_dicts()`` give the API dicts.
+    """
+
+    def __init__(self, data, characters):
+        reader = _Reader(data)
+        self.game = reader.varint()
+        seed = reader.varint()
+        self.seed = None if seed == 0 else _unzigzag(seed - 1)
+        flags = reader.byte()
+        self.drawn = (bool(flags & _ROLES_DRAWN), bool(flags & _CHARACTERS_DRAWN))
+        self.level = reader.byte()
+        self.seats = []
+        self.start_hp = []
+        for _ in range(reader.byte()):
+            character = characters[reader.byte()]
+            self.seats.append((character, ROLES[reader.byte()]))
+            self.start_hp.append(_unzigzag(reader.varint()))
+        winner = reader.byte()
+        self.winner = WINNERS[winner] if winner != 0xFF else None
+        self.rounds = reader.varint()
+        self.nash = tuple(r - 1 if r else None for r in (reader.varint(), reader.varint()))
+        self._data = data
+        self._events_at = reader.pos
+        self._log = None
+
+    def to_log(self):
+        """Return an ``EventLog`` holding only this game."""
+        if self._log is not None:
+            return self._log
+        log = EventLog(self.level)
+        game = self.game
+        log.setups[game] = list(self.seats)
+        log.start_hp[game] = list(self.start_hp)
+        log.seeds[game] = self.seed
+        log.drawn[game] = self.drawn
+        if self.winner is not None:
+            log.winners[game] = self.winner
+            log.end_rounds[game] = self.rounds
+        if self.nash != (None, None):
+            log.nash[game] = list(self.nash)
+
+        reader = _Reader(self._data, self._events_at)
+        byte, varint = reader.byte, reader.varint
+        action_col, round_col, hands = log.action, log.round, log.hands
+        player_col, card_col, target_col, hp_col, hand_at = log.player, log.card, log.target, log.hp, log.hand_at
+        round_ = 0
+        for _ in range(varint()):
+            head = byte()
+            action = head & 0x0F
+            round_ += _unzigzag(varint())
+            action_col.append(action)
+            log.game.append(game)
+            round_col.append(round_)
+            player_col.append(byte() if head & _HAS_PLAYER else -1)
+            card_col.append(byte() if head & _HAS_CARD else -1)
+            target_col.append(byte() if head & _HAS_TARGET else -1)
+            hp_col.append(_unzigzag(varint()) if action == BEER or action == DAMAGED else 0)
+            if head & _HAS_HAND:
+                hand_at.append(len(hands))
+                counts = array("H", bytes(2 * _HAND_SIZE))
+                for _ in range(byte()):
+                    card_id = byte()
+                    counts[card_id] = varint()
+                hands.extend(counts)
+            else:
+                hand_at.append(-1)
+        self._log = log
+        return log
+
+    def iter_dicts(self):
+        return self.to_log().iter_dicts()
+
+    def to_dicts(self):
+        return self.to_log().to_dicts()
+
+    def state_at(self, round_, config=None):
+        """Replay the game from its seed and return its players after ``round_``.
+
+        Round 0 is the setup; past the last round the players are those of
+        the end of the game. The log alone does not say everything (perks
+        heal and draw cards without events), so the game is simulated again
+        with ``simulate_game(rounds=round_)``, with the rules of ``config``
+        (the standard rules by default). A ``ValueError`` is raised when the
+        game has no seed or the replayed setup differs from the archived one
+        (other rules or another version of the simulation).
+        """
+        from main import simulate_game
+
+        if self.seed is None:
+            raise ValueError(f"Game {self.game} has no seed to replay from")
+        roles_drawn, characters_drawn = self.drawn
+        roles = None if roles_drawn else [role for _character, role in self.seats]
+        characters = None if characters_drawn else [character for character, _role in self.seats]
+        if self.winner is not None:
+            round_ = min(round_, self.rounds)
+        _winner, players = simulate_game(
+            len(self.seats), characters, rounds=round_, roles=roles,
+            seed=self.seed, config=config,
+        )
+        if [(p.character, p.role) for p in players] != self.seats:
+            raise ValueError(f"Game {self.game} does not replay to the archived setup")
+        return players
+
+
+class ReplayArchive:
+    """Read-only, memory-mapped view of a replay archive.
+
+    ``archive[i]`` is the ``GameReplay`` of the ``i``-th game added (negative
+    indexes count from the end); only its block is decompressed, and the
+    last decompressed block is kept for neighbouring lookups.
+    """
+
+    def __init__(self, path):
+        self._fh = open(path, "rb")
+        self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._map
+        if data[:len(MAGIC)] != MAGIC or data[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a complete replay archive")
+        self.codec = CODECS[data[len(MAGIC)]]
+        self._decompress = _compressor(self.codec)[1]
+        reader = _Reader(data, len(MAGIC) + 1)
+        size = reader.varint()
+        names = json.loads(bytes(data[reader.pos:reader.pos + size]))
+        self._characters = names["characters"]
+        if names["cards"] != list(CARD_NAMES):
+            self.close()
+            raise ValueError("The archive was written with a different card list")
+        index_at, self.games, self.block_games, _magic = _FOOTER.unpack_from(data, len(data) - _FOOTER.size)
+        blocks = (len(data) - _FOOTER.size - index_at) // _INDEX.size
+        self._index = [_INDEX.unpack_from(data, index_at + i * _INDEX.size) for i in range(blocks)]
+        self._block = (None, None)
+
+    def __len__(self):
+        return self.games
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.games
+        if not 0 <= i < self.games:
+            raise IndexError("game index out of range")
+        number, pos = divmod(i, self.block_games)
+        block, offsets = self._load(number)
+        return GameReplay(block[offsets[pos]:offsets[pos + 1]], self._characters)
+
+    def __iter__(self):
+        for i in range(self.games):
+            yield self[i]
+
+    def _load(self, number):
+        if self._block[0] == number:
+            return self._block[1]
+        offset, length = self._index[number]
+        block = self._decompress(self._map[offset:offset + length])
+        reader = _Reader(block)
+        count = reader.varint()
+        offsets = [0] * (count + 1)
+        lengths = [reader.varint() for _ in range(count)]
+        start = reader.pos
+        for j, length in enumerate(lengths):
+            offsets[j] = start
+            start += length
+        offsets[count] = start
+        self._block = (number, (block, offsets))
+        return self._block[1]
+
+    def close(self):
+        self._map.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
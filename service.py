@@ -1,8 +1,159 @@
-from flask import Flask, request, jsonify, render_template
-from main import simulate_game, compute_probability_matrix, compute_statistics
-from utils import CHARACTERS, CHARACTER_ABILITY_DESCRIPTIONS
+import hashlib
+import json
+import os
+import time
+
+from flask import Flask, Response, g, request, jsonify, render_template, stream_with_context
+from main import (
+    RESULT_STORE, simulate_game, cached_probability_matrix, compute_statistics, iter_statistics, replay_game,
+)
+from cache import SIMULATION_MODULES, ResultCache, code_version
+from events import LEVELS
+from jobs import JobManager
+from metrics import PhaseTimer, Registry
+from utils import CHARACTERS, CHARACTER_ABILITY_DESCRIPTIONS, derive_seed
 
 app = Flask(__name__)
+jobs = JobManager(
+    max_workers=int(os.getenv('BANG_JOB_WORKERS', 2)),
+    ttl=int(os.getenv('BANG_JOB_TTL', 3600)),
+    matrix_workers=int(os.getenv('BANG_JOB_MATRIX_WORKERS', 0)) or None,
+)
+metrics = Registry()
+# Tempo por fase/habilidade tem custo; so e coletado com BANG_PHASE_METRICS=1.
+PHASE_METRICS = os.getenv('BANG_PHASE_METRICS') == '1'
+# Respostas de requisicoes com seed sao funcoes puras dos parametros: o corpo
+# JSON fica num LRU limitado em entradas e em bytes.
+RESPONSE_CACHE = ResultCache(
+    maxsize=int(os.getenv('BANG_RESPONSE_CACHE_ENTRIES', 256)),
+    maxbytes=int(os.getenv('BANG_RESPONSE_CACHE_BYTES', 64 * 1024 * 1024)),
+    sizeof=len,
+)
+RESPONSE_MAX_AGE = int(os.getenv('BANG_RESPONSE_MAX_AGE', 3600))
+# Alem das regras, estes modulos definem o formato das respostas (log,
+# tabelas e a propria rota); todos entram na chave e no ETag.
+RESPONSE_MODULES = SIMULATION_MODULES + ('events.py', 'table.py', 'service.py')
+# Execucoes de /statistics guardam apenas as sementes das partidas; o log de
+# uma partida e refeito em /games/<batch>/<n>/log quando alguem o abre.
+BATCHES = ResultCache(maxsize=int(os.getenv('BANG_BATCHES', 1024)), path=os.getenv('BANG_BATCH_DB'))
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.record_request(endpoint, response.status_code, time.perf_counter() - started)
+    return response
+
+
+def _phase_timer():
+    """Return a fresh ``PhaseTimer`` when phase metrics are enabled."""
+    return PhaseTimer() if PHASE_METRICS else None
+
+
+def _record_simulation(games, started, timer):
+    metrics.record_games(games, time.perf_counter() - started)
+    if timer is not None:
+        metrics.record_timer(timer)
+
+
+def _flag_arg(name):
+    """Read a boolean query parameter such as ``?matrix=1``."""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _ndjson(records):
+    """Stream ``records`` as newline-delimited JSON."""
+    lines = (json.dumps(record) + '\n' for record in records)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+
+def _characters_arg():
+    """Read the optional comma separated ``characters`` query parameter."""
+    chars = request.args.get('characters')
+    return [c.strip() for c in chars.split(',')] if chars else None
+
+
+def _seed_arg():
+    """Read the optional ``seed`` query parameter as an integer."""
+    seed = request.args.get('seed')
+    return int(seed) if seed not in (None, '') else None
+
+
+def _game_records(winner, players_data, log):
+    """NDJSON records of one game: its events, then the result."""
+    for entry in log.iter_dicts():
+        yield {'type': 'event', **entry}
+    yield {'type': 'result', 'winner': winner, 'players': [p.as_dict() for p in players_data]}
+
+
+def _register_batch(players, characters, seeds=None, seed=None, games=None):
+    """Remember a /statistics run and return its batch id.
+
+    The games are given by their ``seeds`` or, for a seeded run, by the base
+    ``seed`` and the number of ``games`` (game ``i`` uses
+    ``derive_seed(seed, i)``).
+    """
+    if seeds is not None:
+        batch = {'players': players, 'characters': characters, 'seeds': seeds}
+    else:
+        batch = {'players': players, 'characters': characters, 'seed': seed, 'games': games}
+    if not (seeds or games):
+        return None
+    batch['version'] = code_version()
+    batch_id = hashlib.blake2b(json.dumps(batch).encode(), digest_size=12).hexdigest()
+    BATCHES.set(['batch', batch_id], batch)
+    return batch_id
+
+
+def _batch_seed(batch, number):
+    """Seed of game ``number`` (1-based) of ``batch``, or ``None`` past its end."""
+    if 'seeds' in batch:
+        return batch['seeds'][number - 1] if 1 <= number <= len(batch['seeds']) else None
+    return derive_seed(batch['seed'], number - 1) if 1 <= number <= batch['games'] else None
+
+
+def _string_seeds(result):
+    """Return a statistics ``result`` with its 64-bit game seeds as strings.
+
+    JavaScript numbers are exact only up to 2**53.
+    """
+    games = [{**game, 'seed': str(game['seed'])} for game in result['game_results']]
+    return {**result, 'game_results': games}
+
+
+def _seeded_response(params, compute, on_serve=None):
+    """Serve a seeded request from ``RESPONSE_CACHE`` with ETag headers.
+
+    ``params`` are the parsed query parameters; together with the route and
+    the version of ``RESPONSE_MODULES`` they form the cache key, so
+    ``players=04`` and ``players=4`` share an entry and a deploy that
+    changes any module shaping the body changes the ETag. The ETag is a
+    hash of that key: a matching ``If-None-Match`` gets a 304 without
+    computing anything.
+    ``compute()`` returns the data to send as JSON and runs once per key,
+    even for concurrent identical requests; ``on_serve()`` runs for every
+    response, cached or not.
+    """
+    key = [request.path, sorted(params.items()), code_version(RESPONSE_MODULES)]
+    etag = hashlib.blake2b(json.dumps(key).encode(), digest_size=16).hexdigest()
+    headers = {'Cache-Control': f'public, max-age={RESPONSE_MAX_AGE}'}
+    if etag in request.if_none_match:
+        response = Response(status=304, headers=headers)
+    else:
+        body = RESPONSE_CACHE.get_or_compute(key, lambda: jsonify(compute()).get_data())
+        response = Response(body, mimetype='application/json', headers=headers)
+    if on_serve is not None:
+        on_serve()
+    response.set_etag(etag)
+    return response
+
 
 @app.route('/')
 def index():
@@ -15,30 +166,171 @@ def simulate_route():
         players = int(request.args.get('players', 4))
     except ValueError:
         return jsonify({'error': 'Invalid players parameter'}), 400
-    chars = request.args.get('characters')
-    characters = [c.strip() for c in chars.split(',')] if chars else None
-    winner, players_data, log = simulate_game(players, characters, return_log=True, game_number=1)
-    return jsonify({'winner': winner, 'players': players_data, 'log': log})
+    try:
+        seed = _seed_arg()
+    except ValueError:
+        return jsonify({'error': 'Invalid seed parameter'}), 400
+    characters = _characters_arg()
+
+    def run():
+        timer = _phase_timer()
+        started = time.perf_counter()
+        result = simulate_game(players, characters, return_log=True, game_number=1, seed=seed, timer=timer)
+        _record_simulation(1, started, timer)
+        return result
+
+    def data():
+        winner, players_data, log = run()
+        return {'winner': winner, 'players': [p.as_dict() for p in players_data], 'log': log.to_dicts()}
+
+    if _flag_arg('stream'):
+        return _ndjson(_game_records(*run()))
+    if seed is not None:
+        return _seeded_response({'players': players, 'seed': seed, 'characters': characters}, data)
+    return jsonify(data())
 
 @app.route('/probability-matrix')
 def matrix_route():
     try:
         players = int(request.args.get('players', 4))
         games = int(request.args.get('games', 50))
+        seed = _seed_arg()
+        ci = request.args.get('ci')
+        ci_half_width = float(ci) / 100 if ci not in (None, '') else None
+        max_games = int(request.args.get('max_games', 2000))
     except ValueError:
         return jsonify({'error': 'Invalid query parameters'}), 400
-    df = compute_probability_matrix(players_count=players, games_per_combo=games)
-    return jsonify(df.to_dict(orient='records'))
+    paired = _flag_arg('paired')
+    if paired and ci_half_width is not None:
+        return jsonify({'error': 'paired does not support ci'}), 400
+
+    def data():
+        simulated = []
+        started = time.perf_counter()
+        table = cached_probability_matrix(
+            players_count=players, games_per_combo=games, seed=seed,
+            progress=lambda done, total: simulated.append(done),
+            ci_half_width=ci_half_width, max_games_per_combo=max_games, paired=paired,
+        )
+        if simulated:
+            _record_simulation(simulated[-1], started, None)
+        return table.to_dict(orient='records')
+
+    if seed is not None:
+        params = {'players': players, 'games': games, 'seed': seed, 'ci_half_width': ci_half_width,
+                  'max_games': max_games, 'paired': paired}
+        return _seeded_response(params, data)
+    return jsonify(data())
 
 @app.route('/statistics')
 def statistics_route():
     try:
         players = int(request.args.get('players', 4))
         games = int(request.args.get('games', 500))
+        seed = _seed_arg()
     except ValueError:
         return jsonify({'error': 'Invalid query parameters'}), 400
-    data = compute_statistics(players_count=players, games=games)
+    log_level = request.args.get('log', 'hands')
+    if log_level not in LEVELS and log_level != 'none':
+        return jsonify({'error': 'Invalid log parameter'}), 400
+    if log_level == 'none':
+        log_level = None
+    timer = _phase_timer()
+    options = dict(
+        players_count=players, games=games, seed=seed,
+        include_matrix=_flag_arg('matrix'), log_level=log_level, characters=_characters_arg(),
+        timer=timer, store=RESULT_STORE,
+    )
+    started = time.perf_counter()
+
+    def register(seeds=None):
+        """Register the run; a seeded run is kept as its base seed and game count."""
+        if seed is not None:
+            return _register_batch(players, options['characters'], seed=seed, games=games)
+        return _register_batch(players, options['characters'], seeds)
+
+    if _flag_arg('stream'):
+        def records():
+            seeds = []
+            for record in iter_statistics(**options):
+                if record['type'] == 'game':
+                    seeds.append(record['seed'])
+                    record = {**record, 'seed': str(record['seed'])}
+                else:
+                    _record_simulation(games, started, timer)
+                    record = {**record, 'batch': register(seeds)}
+                yield record
+        return _ndjson(records())
+
+    def data():
+        result = compute_statistics(**options)
+        _record_simulation(games, started, timer)
+        result['batch'] = register([game['seed'] for game in result['game_results']])
+        return _string_seeds(result)
+
+    if seed is not None:
+        params = {k: v for k, v in options.items() if k not in ('timer', 'store')}
+        # A resposta fica em cache mais tempo que o lote em BATCHES: o lote e
+        # registrado de novo a cada resposta para o id continuar valido.
+        return _seeded_response(params, data, on_serve=register)
+    return jsonify(data())
+
+@app.route('/games/<batch_id>/<int:number>/log')
+def game_log_route(batch_id, number):
+    """Re-simulate game ``number`` of a /statistics batch and return its log."""
+    batch = BATCHES.get(['batch', batch_id])
+    if batch is None:
+        return jsonify({'error': 'Unknown batch'}), 404
+    if batch['version'] != code_version():
+        return jsonify({'error': 'The simulation code changed since this batch ran'}), 410
+    seed = _batch_seed(batch, number)
+    if seed is None:
+        return jsonify({'error': 'Unknown game'}), 404
+    log_level = request.args.get('log', 'hands')
+    if log_level not in LEVELS:
+        return jsonify({'error': 'Invalid log parameter'}), 400
+
+    def run():
+        started = time.perf_counter()
+        result = replay_game(
+            batch['players'], seed, batch['characters'], game_number=number, log_level=LEVELS[log_level],
+        )
+        _record_simulation(1, started, None)
+        return result
+
+    def data():
+        winner, players_data, log = run()
+        return {'game': number, 'seed': str(seed), 'winner': winner,
+                'players': [p.as_dict() for p in players_data], 'log': log.to_dicts()}
+
+    if _flag_arg('stream'):
+        return _ndjson(_game_records(*run()))
+    return _seeded_response({'log': log_level}, data)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job_route():
+    """Queue a statistics or probability-matrix run and return its id."""
+    try:
+        job = jobs.submit(request.get_json(silent=True) or {})
+    except (TypeError, ValueError) as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(job.as_dict(include_result=False)), 202
+
+@app.route('/jobs/<job_id>')
+def job_route(job_id):
+    """Report the progress of a job and its result once finished."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    data = job.as_dict()
+    if 'result' in data and job.spec['kind'] == 'statistics':
+        data['result'] = _string_seeds(data['result'])
     return jsonify(data)
 
+@app.route('/metrics')
+def metrics_route():
+    """Expose service and simulation metrics in Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,253 @@
+"""Compact game state used by ``simulate_game``.
+
+Hands are count vectors indexed by the card ids of ``utils.CARD_IDS`` and
+players are slotted objects. Both keep the old list/dict interfaces (``in``,
+``append``, ``remove``, ``player["hp"]``...) so the character perks and
+``select_target`` work with either representation.
+"""
+from array import array
+
+from utils import CARD_IDS, CARD_NAMES, WEAPON_RANGES
+
+BANG = CARD_IDS["BANG"]
+MISSED = CARD_IDS["MISSED"]
+BEER = CARD_IDS["BEER"]
+SCOPE = CARD_IDS["SCOPE"]
+MUSTANG = CARD_IDS["MUSTANG"]
+# Cartas equipadas assim que entram na mao, em ordem de id.
+EQUIPMENT_IDS = sorted(
+    CARD_IDS[card] for card in list(WEAPON_RANGES) + ["SCOPE", "MUSTANG"]
+)
+
+
+class Hand:
+    """Multiset of cards stored as one counter per card id.
+
+    ``order`` stacks the card ids in the order they were added. Cards taken
+    through the counters are not removed from it: the live copies of a card
+    are always its last ``counts[card_id]`` entries, which is the list
+    behaviour of ``remove`` (drop the oldest copy). So ``pop`` still returns
+    the most recently added card and the iteration order is the one a list
+    hand would have.
+    """
+
+    __slots__ = ("counts", "size", "order")
+
+    def __init__(self, cards=()):
+        self.counts = array("H", bytes(2 * len(CARD_NAMES)))
+        self.size = 0
+        self.order = array("B")
+        for card in cards:
+            self.append(card)
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __contains__(self, card):
+        card_id = CARD_IDS.get(card)
+        return card_id is not None and self.counts[card_id] > 0
+
+    def _live(self):
+        """Card ids of the hand in the order they were added."""
+        left = self.counts.tolist()
+        live = []
+        for card_id in reversed(self.order):
+            if left[card_id]:
+                left[card_id] -= 1
+                live.append(card_id)
+        live.reverse()
+        if len(self.order) > 2 * len(live) + 16:
+            self.order = array("B", live)
+        return live
+
+    def ids(self):
+        """Return the card ids of the hand in the order they were added."""
+        return self._live()
+
+    def __iter__(self):
+        for card_id in self._live():
+            yield CARD_NAMES[card_id]
+
+    def __getitem__(self, index):
+        """Return the ``index``-th card in the order the cards were added."""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("hand index out of range")
+        return CARD_NAMES[self._live()[index]]
+
+    def __eq__(self, other):
+        if not isinstance(other, Hand):
+            try:
+                other = Hand(other)
+            except (TypeError, KeyError):
+                return NotImplemented
+        return self.counts == other.counts
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Hand({list(self)!r})"
+
+    def count(self, card):
+        card_id = CARD_IDS.get(card)
+        return self.counts[card_id] if card_id is not None else 0
+
+    def append(self, card):
+        card_id = CARD_IDS[card]
+        self.counts[card_id] += 1
+        self.size += 1
+        self.order.append(card_id)
+
+    def remove(self, card):
+        card_id = CARD_IDS.get(card)
+        if card_id is None or not self.counts[card_id]:
+            raise ValueError(f"{card!r} not in hand")
+        self.counts[card_id] -= 1
+        self.size -= 1
+
+    def pop(self):
+        """Remove and return the most recently added card."""
+        counts, order = self.counts, self.order
+        while order:
+            card_id = order.pop()
+            if counts[card_id]:
+                counts[card_id] -= 1
+                self.size -= 1
+                return CARD_NAMES[card_id]
+        raise IndexError("pop from empty hand")
+
+    def take_random(self, rng):
+        """Remove and return a uniformly random card.
+
+        Consumes ``rng`` and picks the same card as ``rng.choice(hand)``
+        followed by ``hand.remove(card)`` on a list hand.
+        """
+        card_id = self._live()[rng.randrange(self.size)]
+        self.counts[card_id] -= 1
+        self.size -= 1
+        return CARD_NAMES[card_id]
+
+    def copy(self):
+        hand = Hand()
+        hand.counts[:] = self.counts
+        hand.size = self.size
+        hand.order = array("B", self._live())
+        return hand
+
+
+class Player:
+    """Player state with attribute access and a dict-compatible view."""
+
+    __slots__ = (
+        "id",
+        "role",
+        "character",
+        "hp",
+        "max_hp",
+        "alive",
+        "hand",
+        "weapon",
+        "range_bonus",
+        "dodge_bonus",
+        "unlimited_bang",
+        "can_use_missed_as_bang",
+        "can_use_bang_as_missed",
+        "misses_needed",
+    )
+
+    # Chaves sempre presentes no dicionario e habilidades que so aparecem
+    # quando ativadas.
+    _KEYS = ("id", "role", "character", "hp", "max_hp", "alive", "hand", "weapon", "range_bonus", "dodge_bonus")
+    _FLAGS = ("unlimited_bang", "can_use_missed_as_bang", "can_use_bang_as_missed")
+
+    def __init__(self, player_id, role, character, hp):
+        self.id = player_id
+        self.role = role
+        self.character = character
+        self.hp = hp
+        self.max_hp = hp
+        self.alive = True
+        self.hand = Hand()
+        self.weapon = "BASIC"
+        self.range_bonus = 0
+        self.dodge_bonus = 0
+        self.unlimited_bang = False
+        self.can_use_missed_as_bang = False
+        self.can_use_bang_as_missed = False
+        # MISSED! cards needed to cancel one of this player's BANG!
+        self.misses_needed = 1
+
+    # Acesso estilo dicionario (``player["hp"]``) sobre as chaves de ``as_dict``.
+    __setitem__ = object.__setattr__
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._KEYS or (key in self._FLAGS and getattr(self, key))
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self else default
+
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+
+    def as_dict(self):
+        """Return the player in the dict format used by the API."""
+        data = {key: getattr(self, key) for key in self._KEYS}
+        data["hand"] = list(self.hand)
+        for flag in self._FLAGS:
+            if getattr(self, flag):
+                data[flag] = True
+        return data
+
+    def __repr__(self):
+        return f"Player({self.as_dict()!r})"
+
+
+class AliveCounts:
+    """Living players per role, updated at the moment of each death."""
+
+    __slots__ = ("sheriff", "deputy", "outlaw", "renegade")
+
+    def __init__(self, players):
+        self.sheriff = self.deputy = self.outlaw = self.renegade = 0
+        for player in players:
+            if player.alive:
+                self._add(player.role, 1)
+
+    def _add(self, role, amount):
+        if role == "Outlaw":
+            self.outlaw += amount
+        elif role == "Renegade":
+            self.renegade += amount
+        elif role == "Sheriff":
+            self.sheriff += amount
+        else:
+            self.deputy += amount
+
+    @property
+    def law(self):
+        return self.sheriff + self.deputy
+
+    def kill(self, player):
+        """Mark ``player`` as dead and update the counters."""
+        player.alive = False
+        self._add(player.role, -1)
+
+    def winner(self):
+        """Return the winning team, or ``None`` while the game goes on."""
+        if not self.sheriff:
+            if self.outlaw:
+                return "Outlaws"
+            return "Renegade" if self.renegade else None
+        if not self.outlaw and not self.renegade:
+            return "Sheriff"
+        return None
@@ -0,0 +1,212 @@
+"""Persistent, append-only store of simulated games.
+
+``ResultStore`` keeps one row per game in a local SQLite database: the
+seed, player count, winner, number of rounds, Nash rounds and the
+(character, role) seated at each position. Rows are tagged with
+``cache.code_version()`` so games simulated by older rules are never mixed
+with new ones.
+
+Writes are buffered by ``record`` and inserted ``batch_size`` games per
+transaction; call ``flush`` when a run ends. Reads are aggregate queries
+over the indexed tables, so ``compute_statistics`` and
+``compute_probability_matrix`` can serve accumulated games and only
+simulate the missing ones.
+
+Games either have a fully random setup (``fixed_seat == RANDOM_SETUP``),
+where every seat is an unbiased sample of its (character, role), or were
+dealt around one fixed combo, where only ``fixed_seat`` counts.
+"""
+import sqlite3
+import threading
+
+from cache import code_version
+from utils import CHARACTERS
+
+ROLES = ("Sheriff", "Deputy", "Outlaw", "Renegade")
+WINNERS = ("Sheriff", "Outlaws", "Renegade", "Draw")
+TEAMS = {"Sheriff": "Sheriff", "Deputy": "Sheriff", "Outlaw": "Outlaws", "Renegade": "Renegade"}
+RANDOM_SETUP = -1
+
+_ROLE_INDEX = {name: i for i, name in enumerate(ROLES)}
+_WINNER_INDEX = {name: i for i, name in enumerate(WINNERS)}
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS games (
+        id INTEGER PRIMARY KEY,
+        version TEXT NOT NULL,
+        engine TEXT NOT NULL,
+        players_count INTEGER NOT NULL,
+        seed INTEGER,
+        fixed_seat INTEGER NOT NULL,
+        winner INTEGER NOT NULL,
+        rounds INTEGER NOT NULL,
+        equilibrium_round INTEGER,
+        break_round INTEGER,
+        UNIQUE (version, engine, players_count, fixed_seat, seed)
+    )""",
+    "CREATE INDEX IF NOT EXISTS games_config ON games (version, players_count, engine, fixed_seat)",
+    """CREATE TABLE IF NOT EXISTS seats (
+        game_id INTEGER NOT NULL,
+        seat INTEGER NOT NULL,
+        character INTEGER NOT NULL,
+        role INTEGER NOT NULL,
+        alive INTEGER NOT NULL,
+        won INTEGER NOT NULL,
+        PRIMARY KEY (game_id, seat)
+    ) WITHOUT ROWID""",
+)
+
+
+def _to_sql(seed):
+    """Map an unsigned 64-bit seed onto SQLite's signed INTEGER."""
+    if seed is None:
+        return None
+    return seed - (1 << 64) if seed >= 1 << 63 else seed
+
+
+def _from_sql(seed):
+    if seed is None:
+        return None
+    return seed + (1 << 64) if seed < 0 else seed
+
+
+class ResultStore:
+    """SQLite store of individual games with aggregate queries.
+
+    ``path`` is the database file (created if missing). Games passed to
+    ``record`` are written once ``batch_size`` of them are buffered or when
+    ``flush`` is called. Re-recording a seeded game that is already stored
+    is a no-op.
+    """
+
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.version = code_version()
+        self._pending = []
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def record(self, engine, players_count, seed, seats, winner, rounds,
+               equilibrium_round=None, break_round=None, fixed_seat=RANDOM_SETUP):
+        """Buffer one game; ``seats`` is ``[(character, role, alive)]``."""
+        game = (
+            engine, players_count, _to_sql(seed), fixed_seat, _WINNER_INDEX[winner], rounds,
+            equilibrium_round, break_round,
+            [
+                (seat, CHARACTERS.index(character), _ROLE_INDEX[role], int(alive),
+                 int(TEAMS[role] == winner))
+                for seat, (character, role, alive) in enumerate(seats)
+            ],
+        )
+        with self._lock:
+            self._pending.append(game)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered games in one transaction; return how many were new."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        inserted = 0
+        seat_rows = []
+        with self._connect() as conn:
+            for *game, seats in pending:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO games (version, engine, players_count, seed, fixed_seat,"
+                    " winner, rounds, equilibrium_round, break_round)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self.version] + game,
+                )
+                if cursor.rowcount:
+                    inserted += 1
+                    seat_rows.extend((cursor.lastrowid,) + seat for seat in seats)
+            conn.executemany(
+                "INSERT INTO seats (game_id, seat, character, role, alive, won)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                seat_rows,
+            )
+        return inserted
+
+    def _games(self, conn, where, params, limit=-1):
+        """Return ``[(seed, winner, seats, eq_round, break_round)]`` for the rows matched."""
+        rows = conn.execute(
+            "SELECT id, seed, winner, equilibrium_round, break_round FROM games"
+            " WHERE version = ? AND " + where + " ORDER BY id LIMIT ?",
+            [self.version] + list(params) + [limit],
+        ).fetchall()
+        seats = {}
+        for start in range(0, len(rows), 500):
+            ids = [row[0] for row in rows[start:start + 500]]
+            for game_id, character, role, alive in conn.execute(
+                "SELECT game_id, character, role, alive FROM seats WHERE game_id IN ("
+                + ",".join("?" * len(ids)) + ") ORDER BY game_id, seat",
+                ids,
+            ):
+                seats.setdefault(game_id, []).append((CHARACTERS[character], ROLES[role], bool(alive)))
+        return [
+            (_from_sql(seed), WINNERS[winner], seats[game_id], eq_round, break_round)
+            for game_id, seed, winner, eq_round, break_round in rows
+        ]
+
+    def lookup(self, players_count, seeds, engine="scalar"):
+        """Return ``{seed: (winner, seats, eq_round, break_round)}`` for stored random setups."""
+        found = {}
+        seeds = [_to_sql(seed) for seed in seeds]
+        with self._connect() as conn:
+            for start in range(0, len(seeds), 500):
+                chunk = seeds[start:start + 500]
+                where = (
+                    "players_count = ? AND engine = ? AND fixed_seat = ? AND seed IN ("
+                    + ",".join("?" * len(chunk)) + ")"
+                )
+                for seed, *game in self._games(conn, where, [players_count, engine, RANDOM_SETUP] + chunk):
+                    found[seed] = tuple(game)
+        return found
+
+    def sample(self, players_count, limit, engine="scalar"):
+        """Return up to ``limit`` stored random setups as ``(seed, winner, seats, eq_round, break_round)``."""
+        with self._connect() as conn:
+            games = self._games(
+                conn, "players_count = ? AND engine = ? AND fixed_seat = ?",
+                [players_count, engine, RANDOM_SETUP], limit,
+            )
+        return [tuple(game) for game in games]
+
+    def seat_totals(self, players_count, engine="scalar"):
+        """Return ``{(character, role): (wins, games)}`` over every stored game.
+
+        Random setups count for all of their seats, fixed-combo games only
+        for the fixed seat.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT s.character, s.role, SUM(s.won), COUNT(*)"
+                " FROM games g JOIN seats s ON s.game_id = g.id"
+                " WHERE g.version = ? AND g.players_count = ? AND g.engine = ?"
+                " AND (g.fixed_seat = ? OR s.seat = g.fixed_seat)"
+                " GROUP BY s.character, s.role",
+                (self.version, players_count, engine, RANDOM_SETUP),
+            ).fetchall()
+        return {
+            (CHARACTERS[character], ROLES[role]): (wins, games)
+            for character, role, wins, games in rows
+        }
+
+    def count(self, players_count=None):
+        """Number of stored games (for ``players_count`` if given)."""
+        query = "SELECT COUNT(*) FROM games WHERE version = ?"
+        params = [self.version]
+        if players_count is not None:
+            query += " AND players_count = ?"
+            params.append(players_count)
+        with self._connect() as conn:
+            return conn.execute(query, params).fetchone()[0]
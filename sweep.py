@@ -0,0 +1,120 @@
+"""Parameter sweeps over player counts and rule settings.
+
+``expand_grid`` turns a grid such as ``{"players": [3, 4], "beer_threshold":
+[1, 2]}`` into one cell per combination; besides ``players`` every key is a
+``config.SimulationConfig`` field. ``run_sweep`` plays ``games`` games per
+cell on a process pool, taking cells from one shared queue, and yields a
+tidy long-format table: one row per cell and outcome, with the cell's
+settings, ``wins``, ``games``, ``win_rate`` and ``mean_rounds``.
+
+With ``checkpoint`` every finished cell is appended to that file (one JSON
+line per cell). Running the same sweep again yields the checkpointed rows
+and only plays the missing cells, so an interrupted sweep resumes where it
+stopped.
+"""
+import hashlib
+import itertools
+import json
+import os
+
+from config import SimulationConfig
+from events import SUMMARY, EventLog
+from main import _map_tasks, new_seed, simulate_game
+from utils import Deck, derive_seed
+
+OUTCOMES = ("Sheriff", "Outlaws", "Renegade", "Draw")
+GRID_KEYS = ("players",) + SimulationConfig.__slots__
+
+
+def expand_grid(grid):
+    """Return the list of cells (dicts) of ``grid``, in grid order."""
+    unknown = set(grid) - set(GRID_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    grid = {"players": [4], **grid}
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def cell_id(cell, games):
+    """Stable id of a cell played with ``games`` games."""
+    data = json.dumps([cell, games], sort_keys=True).encode()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _run_cell(task):
+    """Play one cell and return ``(cell_id, rows)``."""
+    cell, games, seed = task
+    key = cell_id(cell, games)
+    config = SimulationConfig(**{k: v for k, v in cell.items() if k != "players"})
+    deck = Deck(config.deck_counts)
+    wins = dict.fromkeys(OUTCOMES, 0)
+    rounds = 0
+    for i in range(games):
+        log = EventLog(SUMMARY)
+        winner, _players = simulate_game(
+            cell["players"], seed=derive_seed(seed, key, i), log=log, deck=deck, config=config,
+        )
+        wins[winner] += 1
+        rounds += log.end_rounds[1]
+
+    settings = {k: json.dumps(v, sort_keys=True) if isinstance(v, dict) else v for k, v in cell.items()}
+    return key, [
+        {
+            **settings,
+            "outcome": outcome,
+            "wins": wins[outcome],
+            "games": games,
+            "win_rate": wins[outcome] / games,
+            "mean_rounds": rounds / games,
+        }
+        for outcome in OUTCOMES
+    ]
+
+
+def _load_checkpoint(path):
+    """Return the checkpoint entries, dropping a line cut by an interruption."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as fh:
+        text = fh.read()
+    complete = text[:text.rfind("\n") + 1]
+    if complete != text:
+        with open(path, "w") as fh:
+            fh.write(complete)
+    return [json.loads(line) for line in complete.splitlines()]
+
+
+def run_sweep(grid, games, seed=None, workers=None, checkpoint=None):
+    """Yield the tidy rows of every cell of ``grid`` as cells finish.
+
+    Game ``i`` of a cell uses ``derive_seed(seed, cell_id, i)``, so results
+    do not depend on ``workers`` or on the order cells finish in. Without
+    ``seed`` the seed of an existing ``checkpoint`` is reused (or a new one
+    drawn). Checkpointed cells are yielded first, in grid order.
+    """
+    cells = expand_grid(grid)
+    entries = _load_checkpoint(checkpoint)
+    if seed is None:
+        seed = entries[0]["seed"] if entries else new_seed()
+    finished = {entry["cell"]: entry["rows"] for entry in entries if entry["seed"] == seed}
+
+    tasks = []
+    for cell in cells:
+        rows = finished.get(cell_id(cell, games))
+        if rows is not None:
+            yield from rows
+        else:
+            tasks.append((cell, games, seed))
+
+    fh = open(checkpoint, "a") if checkpoint else None
+    try:
+        for key, rows in _map_tasks(_run_cell, tasks, workers, ordered=False):
+            if fh is not None:
+                fh.write(json.dumps({"cell": key, "seed": seed, "rows": rows}) + "\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+            yield from rows
+    finally:
+        if fh is not None:
+            fh.close()
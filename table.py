@@ -0,0 +1,86 @@
+"""Small result tables without pandas.
+
+The aggregated results (role stats, the character x role pivot and the
+probability matrix) have at most a few dozen rows, so they are built from
+plain lists of dicts. ``Table`` answers the ``to_dict(orient="records")``
+call the callers already make on DataFrames; ``as_frame`` imports pandas
+only when a caller really wants a DataFrame.
+"""
+
+
+class Table:
+    """Rows (dicts sharing ``columns``) of a small result table."""
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, rows, columns=None):
+        self.rows = list(rows)
+        if columns is None:
+            columns = list(self.rows[0]) if self.rows else []
+        self.columns = list(columns)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __getitem__(self, column):
+        """Return the values of ``column`` as a list."""
+        if column not in self.columns:
+            raise KeyError(column)
+        return [row[column] for row in self.rows]
+
+    def __eq__(self, other):
+        if not isinstance(other, Table):
+            return NotImplemented
+        return self.columns == other.columns and self.rows == other.rows
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Table({len(self.rows)} rows, columns={self.columns!r})"
+
+    def where(self, **values):
+        """Rows whose columns equal ``values``, as a new table."""
+        rows = [row for row in self.rows if all(row[k] == v for k, v in values.items())]
+        return Table(rows, self.columns)
+
+    def to_dict(self, orient="records"):
+        if orient != "records":
+            raise ValueError(f"Unsupported orient: {orient}")
+        return [dict(row) for row in self.rows]
+
+    def as_frame(self):
+        """Return the table as a ``pandas.DataFrame``."""
+        import pandas as pd
+
+        return pd.DataFrame(self.rows, columns=self.columns)
+
+
+def pivot(rows, index, columns, values):
+    """Pivot ``rows`` like ``DataFrame.pivot_table(...).reset_index().fillna(0)``.
+
+    Every ``(index, columns)`` pair must appear at most once. Index values
+    and the new columns come out sorted; missing cells and ``None`` values
+    (NaN for pandas) are ``0.0``. With
+    several ``values`` the new columns are named ``"<value> <column>"``.
+    """
+    if isinstance(values, str):
+        values = [values]
+    keys = sorted({row[columns] for row in rows})
+    if len(values) > 1:
+        names = [(value, key, f"{value} {key}") for value in sorted(values) for key in keys]
+    else:
+        names = [(values[0], key, key) for key in keys]
+    cells = {}
+    for row in rows:
+        cells[row[index], row[columns]] = row
+    out = []
+    for label in sorted({row[index] for row in rows}):
+        record = {index: label}
+        for value, key, name in names:
+            cell = cells.get((label, key))
+            record[name] = float(cell[value]) if cell is not None and cell[value] is not None else 0.0
+        out.append(record)
+    return Table(out, [index] + [name for _value, _key, name in names])
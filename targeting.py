@@ -1,38 +1,132 @@
 import random
 from utils import WEAPON_RANGES
 
-def select_target(player, players):
-    weapon = player.get("weapon", "BASIC")
-    weapon_range = WEAPON_RANGES.get(weapon, {}).get("range", 1)
-    total_range = weapon_range + player.get("range_bonus", 0)
-
-    possible_targets = []
-    for target in players:
-        if target["id"] == player["id"] or not target["alive"]:
-            continue
-        distance = 1 + target.get("dodge_bonus", 0)
-        if distance <= total_range:
-            possible_targets.append(target)
-
-    if player["role"] == "Outlaw":
-        targets = [t for t in possible_targets if t["role"] == "Sheriff"]
-        if not targets:
-            targets = possible_targets
-    elif player["role"] == "Sheriff":
-        targets = [t for t in possible_targets if t["role"] not in ["Sheriff", "Deputy"]]
-    elif player["role"] == "Renegade":
-        outlaw_count = sum(1 for p in players if p["alive"] and p["role"] == "Outlaw")
-        law_count = sum(1 for p in players if p["alive"] and p["role"] in ["Sheriff", "Deputy"])
+
+def weapon_reach(player):
+    """Return how far ``player`` can shoot with the current weapon and scopes."""
+    return WEAPON_RANGES.get(player.weapon, {}).get("range", 1) + player.range_bonus
+
+
+def seat_distances(players):
+    """Return ``{(a.id, b.id): distance}`` around the table for living players.
+
+    Dead players leave the circle, so the distance between two seats is the
+    shorter way around counting only the players still alive.
+    """
+    seated = [p.id for p in players if p.alive]
+    n = len(seated)
+    distances = {}
+    for i, a in enumerate(seated):
+        for j, b in enumerate(seated):
+            if a != b:
+                steps = abs(i - j)
+                distances[(a, b)] = min(steps, n - steps)
+    return distances
+
+
+class TargetingIndex:
+    """Per-game cache used by ``select_target``.
+
+    Keeps each shooter's reach, the seat distances among living players and,
+    per shooter, the players within reach split by the roles it looks for.
+    Call ``equipped`` after a player equips a weapon, SCOPE or MUSTANG and
+    ``died`` after a death; nothing else invalidates the cache.
+    """
+
+    __slots__ = ("players", "reach", "distances", "in_range")
+
+    def __init__(self, players):
+        self.players = players
+        self.reach = {p.id: weapon_reach(p) for p in players}
+        self.distances = seat_distances(players)
+        self.in_range = {}
+
+    def equipped(self, player, card):
+        if card == "MUSTANG":
+            # o alcance de todos os outros ate este jogador mudou
+            self.in_range.clear()
+        else:
+            self.reach[player.id] = weapon_reach(player)
+            self.in_range.pop(player.id, None)
+
+    def died(self, player):
+        self.distances = seat_distances(self.players)
+        self.in_range.clear()
+
+    def targets(self, player, roles=None):
+        """Living players within reach of ``player`` (only ``roles`` if given)."""
+        cached = self.in_range.setdefault(player.id, {})
+        targets = cached.get(roles)
+        if targets is None:
+            if roles is None:
+                reach = self.reach[player.id]
+                distances = self.distances
+                targets = [
+                    t for t in self.players
+                    if t.alive and t.id != player.id
+                    and distances[(player.id, t.id)] + t.dodge_bonus <= reach
+                ]
+            else:
+                targets = [t for t in self.targets(player) if t.role in roles]
+            cached[roles] = targets
+        return targets
+
+
+class _DictPlayer:
+    """Attribute view of a player given as a dict (the format before ``state.Player``)."""
+
+    __slots__ = ("data",)
+
+    # Chaves opcionais no formato antigo e o valor usado quando faltam.
+    _DEFAULTS = {"weapon": "BASIC", "range_bonus": 0, "dodge_bonus": 0}
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getattr__(self, name):
+        try:
+            return self.data[name]
+        except KeyError:
+            if name in self._DEFAULTS:
+                return self._DEFAULTS[name]
+            raise AttributeError(name) from None
+
+
+def select_target(player, players, rng=None, alive=None, index=None):
+    """Choose who ``player`` shoots, or ``None`` when nobody is in range.
+
+    ``alive`` is the game's ``state.AliveCounts``; when given, the Renegade
+    reads the team sizes from it instead of recounting ``players``.
+    ``index`` is the game's ``TargetingIndex``; without it one is built for
+    this call. Players may also be plain dicts with the ``state.Player``
+    keys; the chosen dict is returned.
+    """
+    if isinstance(player, dict):
+        views = [_DictPlayer(p) for p in players]
+        shooter = next(view for view in views if view.data is player)
+        target = select_target(shooter, views, rng)
+        return target.data if target is not None else None
+    if index is None:
+        index = TargetingIndex(players)
+
+    if player.role == "Outlaw":
+        targets = index.targets(player, ("Sheriff",)) or index.targets(player)
+    elif player.role == "Sheriff":
+        targets = index.targets(player, ("Outlaw", "Renegade"))
+    elif player.role == "Renegade":
+        if alive is not None:
+            outlaw_count, law_count = alive.outlaw, alive.law
+        else:
+            outlaw_count = sum(1 for p in players if p.alive and p.role == "Outlaw")
+            law_count = sum(1 for p in players if p.alive and p.role in ["Sheriff", "Deputy"])
 
         if outlaw_count > law_count:
-            prefer_role = "Outlaw"
+            prefer_role = ("Outlaw",)
         else:
-            prefer_role = "Sheriff"
+            prefer_role = ("Sheriff",)
 
-        targets = [t for t in possible_targets if t["role"] == prefer_role]
-        if not targets:
-            targets = possible_targets
+        targets = index.targets(player, prefer_role) or index.targets(player)
     else:
-        targets = possible_targets
+        targets = index.targets(player)
 
-    return random.choice(targets) if targets else None
+    return (rng or random).choice(targets) if targets else None
@@ -0,0 +1,37 @@
+import math
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import pytest
+
+from batch_engine import WINNER_NAMES, simulate_batch
+from main import simulate_game
+from utils import derive_seed
+
+
+@pytest.mark.parametrize("players_count", [3, 4])
+def test_batch_matches_scalar_win_rates(players_count):
+    scalar_games = 800
+    batch_games = 8000
+    scalar = [
+        simulate_game(players_count, seed=derive_seed(2024, players_count, i))[0]
+        for i in range(scalar_games)
+    ]
+    batch = simulate_batch(players_count, batch_games, seed=2024)["winner"]
+
+    for index, name in enumerate(WINNER_NAMES):
+        p_scalar = scalar.count(name) / scalar_games
+        p_batch = float(np.mean(batch == index))
+        pooled = (scalar.count(name) + int(np.sum(batch == index))) / (scalar_games + batch_games)
+        stderr = math.sqrt(pooled * (1 - pooled) * (1 / scalar_games + 1 / batch_games))
+        assert abs(p_scalar - p_batch) <= 4.5 * stderr + 0.005, name
+
+
+def test_batch_is_reproducible():
+    first = simulate_batch(4, 200, seed=7)
+    second = simulate_batch(4, 200, seed=7)
+    for key in first:
+        assert np.array_equal(first[key], second[key])
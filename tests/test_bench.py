@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from bench.run import compare, measure_rss
+
+
+def test_compare_flags_only_slower_cases():
+    baseline = {"results": {
+        "a": {"unit": "games", "games_per_sec": 1000.0},
+        "b": {"unit": "calls", "calls_per_sec": 1000.0},
+    }}
+    results = {
+        "a": {"unit": "games", "games_per_sec": 800.0},
+        "b": {"unit": "calls", "calls_per_sec": 950.0},
+        "c": {"unit": "games", "games_per_sec": 1.0},
+    }
+
+    assert compare(results, baseline, threshold=0.1) == [("a", 1000.0, 800.0)]
+
+
+def test_peak_rss_is_measured_per_case():
+    ballast = bytearray(256 * 1024 * 1024)
+    ballast[::4096] = b"x" * len(ballast[::4096])
+    first = measure_rss("draw_card", quick=True)
+    again = measure_rss("draw_card", quick=True)
+
+    assert 0 < first["peak_rss_kb"] < 200 * 1024
+    assert abs(again["peak_rss_kb"] - first["peak_rss_kb"]) < 50 * 1024
+    assert "children_peak_rss_kb" in first
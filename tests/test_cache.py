@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from cache import ResultCache
+from main import compute_statistics
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.set(["a"], 1)
+    cache.set(["b"], 2)
+    assert cache.get(["a"]) == 1
+    cache.set(["c"], 3)
+
+    assert cache.get(["b"]) is None
+    assert cache.get(["a"]) == 1
+    assert cache.get(["c"]) == 3
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResultCache(path=path).set(["matrix", 4, 50, 1], [{"Win %": 50.0}])
+
+    calls = []
+    value = ResultCache(path=path).get_or_compute(["matrix", 4, 50, 1], lambda: calls.append(1))
+
+    assert value == [{"Win %": 50.0}]
+    assert calls == []
+
+
+def test_statistics_skip_matrix_unless_requested():
+    stats = compute_statistics(players_count=3, games=5, seed=1)
+    assert "probability_matrix" not in stats
+
+
+def test_byte_bound_evicts_and_skips_oversized_values():
+    cache = ResultCache(maxsize=10, maxbytes=10, sizeof=len)
+    cache.set(["a"], b"aaaa")
+    cache.set(["b"], b"bbbb")
+    cache.set(["c"], b"cccc")
+    assert cache.get(["a"]) is None and cache.nbytes == 8
+
+    cache.set(["big"], b"x" * 11)
+    assert cache.get(["big"]) is None and len(cache) == 2
+
+
+def test_concurrent_misses_compute_once():
+    import threading
+    import time
+
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute(["k"], compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 8
@@ -0,0 +1,49 @@
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from cli import main_cli
+from main import compute_statistics
+
+
+def test_simulate_writes_one_row_per_game(tmp_path):
+    output = tmp_path / "games.csv"
+    assert main_cli(["simulate", "--players", "5", "--games", "4", "--seed", "3",
+                     "--output", str(output)]) == 0
+
+    with open(output) as fh:
+        rows = list(csv.DictReader(fh))
+    expected = compute_statistics(5, games=4, seed=3, log_level=None)["game_results"]
+    assert [row["winner"] for row in rows] == [game["winner_role"] for game in expected]
+    assert all(len(row["roles"].split(";")) == 5 for row in rows)
+
+
+def test_sweep_streams_json_per_cell(tmp_path):
+    output = tmp_path / "sweep.json"
+    assert main_cli(["sweep", "--players", "3-4", "--games", "20", "--seed", "1", "--workers", "1",
+                     "--grid", '{"beer_threshold": [1, 3]}', "--format", "json",
+                     "--output", str(output)]) == 0
+
+    with open(output) as fh:
+        rows = [json.loads(line) for line in fh]
+    assert len(rows) == 2 * 2 * 4
+    assert {(row["players"], row["beer_threshold"]) for row in rows} == {(3, 1), (3, 3), (4, 1), (4, 3)}
+    assert sum(row["wins"] for row in rows if row["players"] == 3 and row["beer_threshold"] == 1) == 20
+
+
+def test_invalid_requests_exit_with_status_2(tmp_path):
+    assert main_cli(["stats", "--players", "3-5"]) == 2
+    assert main_cli(["matrix", "--format", "parquet"]) == 2
+
+
+def test_flags_are_only_accepted_where_honored():
+    for argv in (["matrix", "--characters", "Lucky Duke"], ["simulate", "--workers", "2"],
+                 ["stats", "--workers", "2"], ["stats", "--engine", "batch"]):
+        with pytest.raises(SystemExit) as exc:
+            main_cli(argv)
+        assert exc.value.code == 2
@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from events import EVENTS, SUMMARY, EventLog
+from main import simulate_game
+
+
+def test_log_serializes_to_api_dicts():
+    winner, players, log = simulate_game(4, seed=5, return_log=True)
+    entries = log.to_dicts()
+
+    assert entries[0]["action"] == "setup"
+    assert [p["character"] for p in entries[0]["players"]] == [p.character for p in players]
+    assert entries[-1]["action"] == "game_end"
+    assert entries[-1]["winner"] == winner
+    turn = next(e for e in entries if e["action"] == "turn_start")
+    assert set(turn) == {"game", "round", "player", "role", "action", "hand"}
+
+
+def test_levels_limit_what_is_recorded():
+    full = simulate_game(4, seed=5, return_log=True)[2].to_dicts()
+    events = EventLog(EVENTS)
+    summary = EventLog(SUMMARY)
+    simulate_game(4, seed=5, log=events)
+    simulate_game(4, seed=5, log=summary)
+
+    assert [{k: v for k, v in e.items() if k != "hand"} for e in full] == events.to_dicts()
+    assert {e["action"] for e in summary.to_dicts()} <= {
+        "setup", "nash_equilibrium", "nash_equilibrium_broken", "death", "game_end"
+    }
+
+
+def test_nash_rounds_are_first_occurrences():
+    log = EventLog()
+    log.equilibrium(1, 3)
+    log.equilibrium(1, 5, broken=True)
+    log.equilibrium(1, 7)
+
+    assert log.nash_rounds(1) == (3, 5)
+    assert log.nash_rounds(2) == (None, None)
+
+
+def test_rounds_past_65535_are_recorded():
+    log = EventLog(SUMMARY)
+    log.game_end(1, 70000, "Draw")
+
+    assert log.to_dicts()[-1]["round"] == 70000
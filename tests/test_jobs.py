@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from jobs import DONE, JobManager, normalize_spec
+
+
+def _wait(manager, job_id):
+    for _ in range(200):
+        job = manager.get(job_id)
+        if job.status == DONE:
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_job_reports_progress_and_result():
+    manager = JobManager(max_workers=1)
+    job = manager.submit({"kind": "statistics", "players": 3, "games": 10, "seed": 1})
+    job = _wait(manager, job.id)
+
+    assert job.as_dict()["progress"] == {"done": 10, "total": 10}
+    assert sum(row["Wins"] for row in job.result["role_stats"]) == 10
+
+
+def test_cached_matrix_job_reports_full_progress():
+    spec = {"kind": "probability_matrix", "players": 3, "games": 1, "seed": 5}
+    manager = JobManager(max_workers=1, matrix_workers=2)
+    first = _wait(manager, manager.submit(spec).id)
+    other = JobManager(max_workers=1, matrix_workers=2)
+    again = _wait(other, other.submit(spec).id)  # served from MATRIX_CACHE
+
+    assert first.as_dict()["progress"] == {"done": 14 * 3, "total": 14 * 3}
+    assert again.as_dict()["progress"] == first.as_dict()["progress"]
+    assert again.result == first.result
+
+
+def test_identical_specs_share_one_running_job():
+    manager = JobManager(max_workers=1)
+    first = manager.submit({"players": 3, "games": 50, "seed": 2})
+    second = manager.submit({"players": "3", "games": 50, "seed": 2})
+    assert first is second
+    _wait(manager, first.id)
+
+
+def test_finished_jobs_expire_after_ttl():
+    manager = JobManager(max_workers=1, ttl=0)
+    job = manager.submit({"players": 3, "games": 2, "seed": 3})
+    while job.finished_at is None:
+        time.sleep(0.01)
+    time.sleep(0.01)
+    assert manager.get(job.id) is None
+
+
+def test_invalid_specs_are_rejected():
+    with pytest.raises(ValueError):
+        normalize_spec({"kind": "unknown"})
+    with pytest.raises(ValueError):
+        normalize_spec({"players": 9})
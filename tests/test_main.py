@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from main import compute_statistics, replay_game, simulate_game
+
+
+def test_simulate_game_is_reproducible_from_seed():
+    first = simulate_game(5, seed=123, return_log=True)
+    second = simulate_game(5, seed=123, return_log=True)
+    assert first[0] == second[0]
+    assert first[2] == second[2]
+
+
+def test_game_ends_on_the_deciding_death():
+    for seed in range(20):
+        winner, players, log = simulate_game(4, seed=seed, return_log=True)
+        entries = log.to_dicts()
+        deaths = [e for e in entries if e["action"] == "death"]
+        if winner != "Draw":
+            # nothing happens between the deciding death and the end of the game
+            assert entries[-2] == deaths[-1]
+
+
+def test_every_game_of_a_batch_replays_from_its_seed():
+    stats = compute_statistics(5, games=12, characters=None)
+    for result in stats["game_results"]:
+        game = result["game"]
+        winner, _players, log = replay_game(5, result["seed"], game_number=game)
+        assert winner == result["winner_role"]
+        assert log.to_dicts() == [e for e in stats["log"] if e["game"] == game]
@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from main import compute_probability_matrix
+
+
+def test_probability_matrix_same_result_for_any_workers():
+    serial = compute_probability_matrix(5, games_per_combo=3, workers=1, seed=42)
+    parallel = compute_probability_matrix(5, games_per_combo=3, workers=2, seed=42)
+    assert serial == parallel
+
+
+def test_probability_matrix_without_deputy():
+    table = compute_probability_matrix(4, games_per_combo=2, workers=1, seed=7)
+    deputy = table.where(Role="Deputy")
+    assert set(deputy["Games"]) == {0}
+    assert all(deputy[column] == [None] * 14 for column in ("Win %", "Loss %", "CI low", "CI high"))
+    sheriff = table.where(Role="Sheriff")
+    assert all(row["Win %"] + row["Loss %"] == 100 for row in sheriff)
+
+
+def test_probability_matrix_as_frame_matches_table():
+    table = compute_probability_matrix(3, games_per_combo=1, workers=1, seed=9)
+    df = compute_probability_matrix(3, games_per_combo=1, workers=1, seed=9, as_frame=True)
+    assert list(df.columns) == table.columns
+    # combos without games are None in the table and NaN in the DataFrame
+    assert df.astype(object).where(df.notna(), None).to_dict(orient="records") == table.to_dict()
+
+
+def test_wilson_interval_contains_estimate():
+    from main import wilson_interval
+
+    low, high = wilson_interval(30, 100)
+    assert low < 0.3 < high
+    assert round(low, 3) == 0.219 and round(high, 3) == 0.396
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_adaptive_matrix_stops_at_target_or_budget():
+    df = compute_probability_matrix(3, games_per_combo=25, workers=1, seed=5,
+                                    ci_half_width=0.1, max_games_per_combo=100, as_frame=True)
+    played = df[df["Games"] > 0]
+    half_width = (played["CI high"] - played["CI low"]) / 2
+    assert ((half_width <= 10) | (played["Games"] == 100)).all()
+    assert played["Games"].min() >= 25
+
+
+def test_matrix_credits_every_seat_of_each_game():
+    table = compute_probability_matrix(3, games_per_combo=4, workers=1, seed=3)
+    played = [games for games in table["Games"] if games > 0]
+    assert len(played) == 14 * 3
+    # every game counts for all 3 seats: 4 fixed games x 3 seats per combo
+    assert sum(played) == 4 * len(played) * 3
+
+
+def test_paired_matrix_plays_every_character_in_the_same_scenarios():
+    table = compute_probability_matrix(4, games_per_combo=6, workers=1, seed=2, paired=True)
+    again = compute_probability_matrix(4, games_per_combo=6, workers=2, seed=2, paired=True)
+    assert table == again
+
+    played = [row for row in table if row["Games"]]
+    assert len(played) == 14 * 3 and {row["Games"] for row in played} == {6}
+    for role in ("Sheriff", "Outlaw", "Renegade"):
+        rows = table.where(Role=role)
+        # deltas are taken against the mean of the same scenarios
+        assert abs(sum(row["Delta %"] for row in rows)) < 1e-9
+        assert all(row["Delta SE"] is not None and row["Delta SE"] >= 0 for row in rows)
+    assert all(row["Delta %"] is None for row in table.where(Role="Deputy"))
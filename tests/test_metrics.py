@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from main import simulate_game
+from metrics import PHASES, PhaseTimer, Registry
+
+
+def test_phase_timer_aggregates_games_and_perks():
+    timer = PhaseTimer()
+    for seed in range(3):
+        simulate_game(4, characters=["Bart Cassidy", "Suzy Lafayette", "Kit Carlson", "Black Jack"],
+                      seed=seed, timer=timer)
+
+    assert timer.games == 3
+    assert timer.calls["setup"] == 3
+    assert all(timer.calls[phase] for phase in ("turn_start", "draw", "equip", "attack"))
+    assert timer.perk_calls[("Kit Carlson", "draw_phase")] > 0
+
+
+def test_timer_does_not_change_the_game():
+    plain = simulate_game(5, seed=11, return_log=True)
+    timed = simulate_game(5, seed=11, return_log=True, timer=PhaseTimer())
+    assert plain[0] == timed[0]
+    assert plain[2] == timed[2]
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    registry.record_games(10, 0.5)
+    timer = PhaseTimer()
+    timer.ns["draw"], timer.calls["draw"] = 2_000_000, 4
+    registry.record_timer(timer)
+    text = registry.render()
+
+    assert "bang_games_simulated_total 10" in text
+    assert "bang_games_per_second 20.0" in text
+    assert 'bang_phase_calls_total{phase="draw"} 4' in text
+    assert len([line for line in text.splitlines() if line.startswith("bang_phase_seconds_total")]) == len(PHASES)
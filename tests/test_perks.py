@@ -43,3 +43,29 @@ def test_jesse_jones_steals_card():
     assert taken is True
     assert jesse["hand"] == ["MISSED"]
     assert victim["hand"] == []
+
+
+def test_registered_character_only_gets_its_events():
+    from main import simulate_game
+    from utils import (
+        CHARACTER_ABILITY_DESCRIPTIONS, CHARACTER_EVENTS, CHARACTERS, perk_hooks, register_character,
+    )
+
+    calls = []
+
+    @register_character("Test Drifter", "turn_end")
+    def drifter(player, event, **_):
+        """Does nothing, loudly."""
+        calls.append(event)
+
+    try:
+        hooks = perk_hooks(["Test Drifter", "Paul Regret"])
+        assert hooks["turn_end"][0] is drifter and hooks["turn_end"][1] is None
+        assert hooks["start"][0] is None and hooks["start"][1] is not None
+
+        simulate_game(3, characters=["Test Drifter", "Bart Cassidy", "Sid Ketchum"], seed=2)
+        assert calls and set(calls) == {"turn_end"}
+    finally:
+        CHARACTERS.remove("Test Drifter")
+        for registry in (CHARACTER_PERKS, CHARACTER_EVENTS, CHARACTER_ABILITY_DESCRIPTIONS):
+            del registry["Test Drifter"]
@@ -0,0 +1,70 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from events import EVENTS, EventLog
+from main import simulate_game
+from replay import ReplayArchive, ReplayWriter
+from utils import derive_seed
+
+
+def _record(path, games, level=None, **kwargs):
+    logs, players = [], []
+    with ReplayWriter(path, **kwargs) as writer:
+        for i in range(games):
+            log = EventLog() if level is None else EventLog(level)
+            characters = ["Sid Ketchum", "Kit Carlson", "Lucky Duke"] if i % 3 == 0 else None
+            count = 3 if characters else 3 + i % 5
+            players.append(simulate_game(count, characters, seed=derive_seed(4, i), game_number=i + 1, log=log)[1])
+            writer.add(log)
+            logs.append(log)
+    return logs, players
+
+
+def test_archive_round_trips_every_game(tmp_path):
+    path = str(tmp_path / "games.bangr")
+    logs, _players = _record(path, 40, block_games=8)
+
+    with ReplayArchive(path) as archive:
+        assert len(archive) == 40
+        for i in (0, 7, 8, 39, -1, 17):
+            game = archive[i]
+            assert game.to_dicts() == logs[i].to_dicts()
+            assert game.seed == derive_seed(4, i % 40)
+        assert [game.game for game in archive] == list(range(1, 41))
+        with pytest.raises(IndexError):
+            archive[40]
+
+    size = os.path.getsize(path)
+    assert size * 20 < sum(len(json.dumps(log.to_dicts())) for log in logs)
+
+
+def test_state_at_replays_the_game(tmp_path):
+    path = str(tmp_path / "games.bangr")
+    _logs, players = _record(path, 12, level=EVENTS, codec="none")
+
+    with ReplayArchive(path) as archive:
+        for game, final in zip(archive, players):
+            assert [p.as_dict() for p in game.state_at(game.rounds + 5)] == [p.as_dict() for p in final]
+            setup = game.state_at(0)
+            assert [p.hp for p in setup] == game.start_hp
+            assert all(p.alive for p in setup)
+
+
+def test_incomplete_archive_is_rejected(tmp_path):
+    path = str(tmp_path / "games.bangr")
+    writer = ReplayWriter(path)
+    log = EventLog()
+    simulate_game(4, seed=1, log=log)
+    writer.add(log)
+    writer._fh.flush()
+
+    with pytest.raises(ValueError):
+        ReplayArchive(path)
+    writer.close()
+    with ReplayArchive(path) as archive:
+        assert archive[0].to_dicts() == log.to_dicts()
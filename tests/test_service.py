@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from service import app
+
+
+def test_statistics_stream_yields_games_then_summary():
+    client = app.test_client()
+    response = client.get('/statistics?players=3&games=4&seed=1&stream=1&log=none')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert [r['type'] for r in records] == ['game'] * 4 + ['summary']
+    assert records[-1]['games'] == 4
+    assert sum(row['Wins'] for row in records[-1]['role_stats']) == 4
+
+
+def test_statistics_stream_matches_plain_response():
+    client = app.test_client()
+    plain = client.get('/statistics?players=3&games=3&seed=2').get_json()
+    lines = client.get('/statistics?players=3&games=3&seed=2&stream=1').get_data(as_text=True)
+    records = [json.loads(line) for line in lines.splitlines()]
+
+    assert [e for r in records[:-1] for e in r['log']] == plain['log']
+    assert records[-1]['role_stats'] == plain['role_stats']
+
+
+def test_jobs_endpoints():
+    client = app.test_client()
+    response = client.post('/jobs', json={'players': 3, 'games': 3, 'seed': 4})
+    assert response.status_code == 202
+    job_id = response.get_json()['id']
+
+    assert client.get('/jobs/' + job_id).status_code == 200
+    assert client.get('/jobs/missing').status_code == 404
+    assert client.post('/jobs', json={'players': 12}).status_code == 400
+
+
+def test_simulate_reports_which_parameter_is_invalid():
+    client = app.test_client()
+    assert client.get('/simulate?seed=abc').get_json() == {'error': 'Invalid seed parameter'}
+    assert client.get('/simulate?players=x').get_json() == {'error': 'Invalid players parameter'}
+
+
+def test_metrics_endpoint_reports_games_and_latency():
+    client = app.test_client()
+    client.get('/simulate?players=3&seed=1')
+    body = client.get('/metrics').get_data(as_text=True)
+
+    assert 'bang_games_simulated_total' in body
+    assert 'bang_request_duration_seconds_count{endpoint="/simulate",status="200"}' in body
+
+
+def test_seeded_responses_are_cached_with_etag(monkeypatch):
+    import service
+
+    calls = []
+    compute = service.compute_statistics
+    monkeypatch.setattr(service, 'compute_statistics', lambda **kw: calls.append(1) or compute(**kw))
+    client = app.test_client()
+
+    first = client.get('/statistics?players=3&games=2&seed=11&log=none')
+    again = client.get('/statistics?games=02&players=3&log=none&seed=11')
+    assert calls == [1]
+    assert again.get_data() == first.get_data()
+    assert first.headers['Cache-Control'].startswith('public, max-age=')
+    assert first.headers['ETag'] == again.headers['ETag']
+
+    cached = client.get('/statistics?players=3&games=2&seed=11&log=none',
+                        headers={'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304 and cached.get_data() == b''
+
+    unseeded = client.get('/statistics?players=3&games=2&log=none')
+    assert 'ETag' not in unseeded.headers
+    assert calls == [1, 1]
+
+
+def test_game_logs_are_replayed_from_the_batch_seeds():
+    client = app.test_client()
+    stats = client.get('/statistics?players=4&games=5&seed=21').get_json()
+    batch = stats['batch']
+    assert [game['seed'] for game in stats['game_results']] == [
+        json.loads(line)['seed']
+        for line in client.get('/statistics?players=4&games=5&seed=21&stream=1').get_data(as_text=True).splitlines()
+        if json.loads(line)['type'] == 'game'
+    ]
+
+    for result in stats['game_results']:
+        n = result['game']
+        replay = client.get(f'/games/{batch}/{n}/log').get_json()
+        assert replay['winner'] == result['winner_role']
+        assert replay['log'] == [e for e in stats['log'] if e['game'] == n]
+
+    assert client.get(f'/games/{batch}/6/log').status_code == 404
+    assert client.get('/games/unknown/1/log').status_code == 404
+    assert client.get(f'/games/{batch}/1/log?log=none').status_code == 400
+
+
+def test_cached_statistics_keep_their_batch_replayable():
+    import service
+    from utils import derive_seed
+
+    client = app.test_client()
+    stats = client.get('/statistics?players=3&games=2&seed=2&log=none').get_json()
+    assert [game['seed'] for game in stats['game_results']] == [str(derive_seed(2, i)) for i in range(2)]
+
+    service.BATCHES.clear()
+    cached = client.get('/statistics?players=3&games=2&seed=2&log=none').get_json()
+    assert cached['batch'] == stats['batch']
+    replay = client.get(f"/games/{stats['batch']}/2/log").get_json()
+    assert replay['seed'] == stats['game_results'][1]['seed']
+
+
+def test_etag_covers_every_module_shaping_the_response():
+    import service
+
+    for name in ('events.py', 'table.py', 'batch_engine.py', 'service.py'):
+        assert name in service.RESPONSE_MODULES
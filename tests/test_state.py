@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from state import AliveCounts, Hand, Player
+from utils import CHARACTER_PERKS
+
+
+def test_hand_behaves_like_card_list():
+    hand = Hand(["BANG", "MISSED", "BANG"])
+    assert len(hand) == 3
+    assert "MISSED" in hand and "BEER" not in hand
+    assert hand.count("BANG") == 2
+    hand.remove("BANG")
+    assert list(hand) == ["MISSED", "BANG"]
+    hand.append("BEER")
+    assert hand.pop() == "BEER"
+    assert hand.pop() == "BANG"
+    assert list(hand) == ["MISSED"]
+
+
+def test_take_random_matches_choice():
+    import random
+
+    cards = ["BANG", "MISSED", "BANG", "BEER", "SCOPE"]
+    for seed in range(20):
+        hand = Hand(cards)
+        expected = random.Random(seed).choice(hand)
+        assert hand.take_random(random.Random(seed)) == expected
+        assert len(hand) == 4 and hand.count(expected) == cards.count(expected) - 1
+
+
+def test_player_dict_view_and_perks():
+    player = Player(0, "Sheriff", "Calamity Janet", 5)
+    CHARACTER_PERKS["Calamity Janet"](player, "start")
+    player["hand"].append("BEER")
+    assert player.can_use_bang_as_missed
+    assert player.as_dict() == {
+        "id": 0,
+        "role": "Sheriff",
+        "character": "Calamity Janet",
+        "hp": 5,
+        "max_hp": 5,
+        "alive": True,
+        "hand": ["BEER"],
+        "weapon": "BASIC",
+        "range_bonus": 0,
+        "dodge_bonus": 0,
+        "can_use_missed_as_bang": True,
+        "can_use_bang_as_missed": True,
+    }
+
+
+def test_player_dict_view_only_has_the_dict_keys():
+    player = Player(0, "Outlaw", "Willy the Kid", 4)
+    assert "hp" in player and "misses_needed" not in player
+    assert "unlimited_bang" not in player and player.get("unlimited_bang") is None
+    with pytest.raises(KeyError):
+        player["missing"]
+
+    CHARACTER_PERKS["Willy the Kid"](player, "start")
+    assert "unlimited_bang" in player and player["unlimited_bang"]
+
+
+def test_alive_counts_track_deaths_and_winner():
+    roles = ["Sheriff", "Outlaw", "Outlaw", "Renegade"]
+    players = [Player(i, role, "Bart Cassidy", 4) for i, role in enumerate(roles)]
+    alive = AliveCounts(players)
+    assert (alive.law, alive.outlaw, alive.renegade) == (1, 2, 1)
+    assert alive.winner() is None
+
+    alive.kill(players[1])
+    alive.kill(players[3])
+    assert not players[1].alive
+    assert alive.winner() is None
+    alive.kill(players[2])
+    assert alive.winner() == "Sheriff"
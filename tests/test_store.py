@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from main import compute_probability_matrix, compute_statistics
+from store import ResultStore
+
+
+def test_seeded_statistics_are_served_from_store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"), batch_size=4)
+    fresh = compute_statistics(4, games=10, seed=3, log_level=None)
+    first = compute_statistics(4, games=10, seed=3, log_level=None, store=store)
+    assert store.count(4) == 10
+
+    again = compute_statistics(4, games=15, seed=3, log_level=None, store=store)
+
+    assert first == fresh
+    assert again["game_results"][:10] == fresh["game_results"]
+    assert store.count(4) == 15
+
+
+def test_unseeded_statistics_only_top_up(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    compute_statistics(5, games=8, log_level=None, store=store)
+    compute_statistics(5, games=12, log_level=None, store=store)
+
+    assert store.count(5) == 12
+    wins = sum(wins for wins, _games in store.seat_totals(5).values())
+    games = sum(games for _wins, games in store.seat_totals(5).values())
+    assert games == 12 * 5
+    assert 0 < wins < games
+
+
+def test_matrix_tops_up_missing_combos(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    first = compute_probability_matrix(3, games_per_combo=2, workers=1, seed=1, store=store)
+    stored = store.count(3)
+    again = compute_probability_matrix(3, games_per_combo=2, workers=1, seed=1, store=store)
+
+    assert stored == 14 * 3 * 2
+    assert store.count(3) == stored
+    assert again == first
+
+    more = compute_probability_matrix(3, games_per_combo=3, workers=1, seed=1, store=store)
+    assert store.count(3) == 14 * 3 * 3
+    assert more == compute_probability_matrix(3, games_per_combo=3, workers=1, seed=1, store=store)
+    assert {games for games in more["Games"] if games > 0} == {3}
+
+
+def test_version_covers_both_engines():
+    from cache import SIMULATION_MODULES
+
+    assert {"main.py", "batch_engine.py"} <= set(SIMULATION_MODULES)
+
+
+def test_seedless_batch_games_are_not_stored(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    for _ in range(2):
+        compute_statistics(4, games=20, seed=2, engine="batch", log_level=None, store=store)
+
+    assert store.count(4) == 0
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import sweep
+from config import SimulationConfig
+from main import simulate_game
+
+
+def test_default_config_keeps_the_standard_rules():
+    plain = simulate_game(5, seed=8, return_log=True)
+    configured = simulate_game(5, seed=8, return_log=True, config=SimulationConfig())
+    assert plain[0] == configured[0]
+    assert plain[2] == configured[2]
+
+
+def test_config_knobs_change_the_game():
+    no_beer = SimulationConfig(beer_threshold=0, deck_counts={"DYNAMITE": 0})
+    assert no_beer.deck_counts["BEER"] == 6 and no_beer.deck_counts["DYNAMITE"] == 0
+    for seed in range(10):
+        log = simulate_game(4, seed=seed, return_log=True, config=no_beer)[2]
+        assert not [e for e in log.to_dicts() if e["action"] == "beer"]
+
+    winner, _players = simulate_game(4, seed=1, config=SimulationConfig(rounds=0))
+    assert winner == "Draw"
+
+
+def test_interrupted_sweep_resumes_from_checkpoint(tmp_path, monkeypatch):
+    grid = {"players": [3, 4], "beer_threshold": [1, 2]}
+    checkpoint = str(tmp_path / "sweep.ckpt")
+    full = list(sweep.run_sweep(grid, 5, seed=2, workers=1))
+
+    partial = sweep.run_sweep(grid, 5, seed=2, workers=1, checkpoint=checkpoint)
+    for _ in range(len(sweep.OUTCOMES)):
+        next(partial)
+    partial.close()
+    with open(checkpoint, "a") as fh:
+        fh.write('{"cell": "cut short')
+
+    played = []
+    run_cell = sweep._run_cell
+    monkeypatch.setattr(sweep, "_run_cell", lambda task: played.append(task) or run_cell(task))
+    resumed = list(sweep.run_sweep(grid, 5, workers=1, checkpoint=checkpoint))
+
+    assert len(played) == 3
+    key = lambda row: (row["players"], row["beer_threshold"], row["outcome"])
+    assert sorted(resumed, key=key) == sorted(full, key=key)
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from table import Table, pivot
+
+
+def test_pivot_matches_pandas_pivot_table():
+    rows = [
+        {"Character": "Suzy Lafayette", "Role": "Outlaw", "Win Rate (%)": 10.0},
+        {"Character": "Bart Cassidy", "Role": "Sheriff", "Win Rate (%)": 5.0},
+        {"Character": "Bart Cassidy", "Role": "Outlaw", "Win Rate (%)": 2.5},
+    ]
+    import pandas as pd
+
+    expected = (
+        pd.DataFrame(rows).pivot_table(index="Character", columns="Role", values="Win Rate (%)")
+        .reset_index().fillna(0).to_dict(orient="records")
+    )
+    assert pivot(rows, "Character", "Role", "Win Rate (%)").to_dict() == expected
+    assert pivot([], "Character", "Role", "Win Rate (%)").to_dict() == []
+
+    table = Table(rows)
+    assert table["Role"] == ["Outlaw", "Sheriff", "Outlaw"]
+    assert len(table.where(Role="Outlaw")) == 2
+    assert table.as_frame().to_dict(orient="records") == rows
+
+
+def test_statistics_and_cli_do_not_import_pandas():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (
+        "import sys, cli\n"
+        "cli.main_cli(['stats', '--games', '5', '--seed', '1', '--output', sys.argv[1]])\n"
+        "cli.main_cli(['matrix', '--players', '3', '--games', '1', '--workers', '1',"
+        " '--seed', '1', '--output', sys.argv[1]])\n"
+        "assert 'pandas' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code, os.devnull], cwd=root, check=True)
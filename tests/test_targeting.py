@@ -31,3 +31,51 @@ def test_renegade_targets_majority():
     outlaw1["alive"] = False
     target = select_target(renegade, players)
     assert target["role"] == "Sheriff"
+
+
+def test_select_target_accepts_player_objects():
+    from state import Player
+
+    shooter = Player(0, "Outlaw", "Bart Cassidy", 4)
+    players = [shooter, Player(1, "Sheriff", "Bart Cassidy", 5), Player(2, "Renegade", "Bart Cassidy", 4)]
+    assert select_target(shooter, players).role == "Sheriff"
+
+
+def test_seat_distance_skips_dead_players():
+    from state import Player
+    from targeting import seat_distances
+
+    players = [Player(i, "Outlaw", "Bart Cassidy", 4) for i in range(5)]
+    assert seat_distances(players)[(0, 2)] == 2
+    assert seat_distances(players)[(0, 4)] == 1
+
+    players[1].alive = False
+    assert seat_distances(players)[(0, 2)] == 1
+
+
+def test_index_is_refreshed_on_equip_and_death():
+    from state import Player
+    from targeting import TargetingIndex
+
+    sheriff = Player(0, "Sheriff", "Bart Cassidy", 5)
+    players = [sheriff] + [Player(i, "Outlaw", "Bart Cassidy", 4) for i in range(1, 5)]
+    index = TargetingIndex(players)
+    assert [t.id for t in index.targets(sheriff)] == [1, 4]
+
+    sheriff.weapon = "SCHOFIELD"
+    index.equipped(sheriff, "SCHOFIELD")
+    assert [t.id for t in index.targets(sheriff)] == [1, 2, 3, 4]
+
+    players[3].dodge_bonus += 1
+    index.equipped(players[3], "MUSTANG")
+    assert [t.id for t in index.targets(sheriff)] == [1, 2, 4]
+
+    players[1].alive = False
+    index.died(players[1])
+    assert [t.id for t in index.targets(sheriff)] == [2, 4]
+
+
+def test_dict_players_may_omit_optional_keys():
+    shooter = {"id": 0, "role": "Outlaw", "alive": True}
+    sheriff = {"id": 1, "role": "Sheriff", "alive": True}
+    assert select_target(shooter, [shooter, sheriff]) is sheriff
@@ -35,3 +35,44 @@ def test_get_roles_distribution():
     assert Counter(get_roles(6)) == Counter({"Sheriff": 1, "Outlaw": 3, "Renegade": 1, "Deputy": 1})
     assert Counter(get_roles(7)) == Counter({"Sheriff": 1, "Outlaw": 3, "Renegade": 1, "Deputy": 2})
 
+
+def test_derive_seed_is_stable_and_distinct():
+    from utils import derive_seed
+
+    assert derive_seed(1, 0) == derive_seed(1, 0)
+    assert len({derive_seed(1, i) for i in range(100)}) == 100
+
+
+def test_deck_deals_like_a_shuffled_list():
+    import random
+    from utils import DECK_COUNTS, build_deck, draw_card
+
+    cards = [card for card, count in DECK_COUNTS.items() for _ in range(count)]
+    random.Random(4).shuffle(cards)
+    deck = build_deck(random.Random(4))
+
+    assert list(deck) == cards
+    assert [draw_card(deck, deck.discards) for _ in range(3)] == cards[::-1][:3]
+
+
+def test_deck_reshuffles_discards_and_takes_cards_back():
+    import random
+    from utils import DECK_SIZE, Deck
+
+    deck = Deck()
+    deck.reset(random.Random(1))
+    discard = deck.discards
+    drawn = [deck.draw() for _ in range(DECK_SIZE)]
+    assert deck.draw() is None
+
+    discard.append(drawn[0])
+    discard.append(drawn[1])
+    assert discard.pop() == drawn[1]
+    assert list(discard) == [drawn[0]]
+
+    assert deck.draw(refill=False) is None
+    assert deck.draw() == drawn[0]
+    assert len(deck) == 0 and len(discard) == 0
+
+    deck.append("BEER")
+    assert deck.draw() == "BEER"
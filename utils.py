@@ -1,3 +1,4 @@
+import hashlib
 import random
 
 DECK_COUNTS = {
@@ -18,6 +19,10 @@ DECK_COUNTS = {
     "SCOPE": 1
 }
 
+# Integer card ids follow the ``DECK_COUNTS`` order.
+CARD_NAMES = list(DECK_COUNTS)
+CARD_IDS = {name: i for i, name in enumerate(CARD_NAMES)}
+
 WEAPON_RANGES = {
     "VOLCANIC": {"range": 1, "multi_shot": True},
     "SCHOFIELD": {"range": 2, "multi_shot": False},
@@ -29,39 +34,109 @@ WEAPON_RANGES = {
 # ---------------------------------------------------------------------------
 # Character abilities
 # ---------------------------------------------------------------------------
-def bart_cassidy(player, event, deck=None, discard=None, **_):
+# Events sent to the perks by ``main.simulate_game``:
+#   start              once at setup
+#   turn_start         start of the player's turn (discard, rng)
+#   damaged            after losing a life point (deck, discard, rng)
+#   draw_phase         replaces the draw phase when the perk returns a truthy
+#                      value; "skip" skips both cards, anything else one
+#                      (players, deck, discard, rng)
+#   draw               replaces each normal draw of the draw phase
+#   damaged_by_player  after a hit by ``attacker`` (attacker, rng)
+#   turn_end           end of the player's turn (deck, discard, rng)
+PERK_EVENTS = (
+    "start", "turn_start", "damaged", "draw_phase", "draw", "damaged_by_player", "turn_end",
+)
+
+CHARACTER_PERKS = {}
+# Events each character reacts to; the others are never sent to its perk.
+CHARACTER_EVENTS = {}
+CHARACTER_ABILITY_DESCRIPTIONS = {}
+# Registration order; ``simulate_game`` samples characters from this list.
+CHARACTERS = []
+
+
+def register_character(name, *events):
+    """Register the decorated function as the perk of character ``name``.
+
+    ``events`` lists the ``PERK_EVENTS`` the perk handles. Registered
+    characters are playable by ``simulate_game`` without further changes.
+    """
+    unknown = set(events) - set(PERK_EVENTS)
+    if unknown:
+        raise ValueError(f"Unknown perk events: {sorted(unknown)}")
+
+    def decorator(func):
+        if name not in CHARACTER_PERKS:
+            CHARACTERS.append(name)
+        CHARACTER_PERKS[name] = func
+        CHARACTER_EVENTS[name] = frozenset(events)
+        CHARACTER_ABILITY_DESCRIPTIONS[name] = func.__doc__.strip() if func.__doc__ else ""
+        return func
+    return decorator
+
+
+def perk_hooks(characters, perks=None):
+    """Return ``{event: [perk or None per seat]}`` for one game.
+
+    ``characters`` is the character of each seat and ``perks`` maps names to
+    perk functions (``CHARACTER_PERKS`` by default; ``metrics.PhaseTimer``
+    passes timed wrappers). Seats whose character ignores an event get
+    ``None``, so the game loop skips the call.
+    """
+    perks = CHARACTER_PERKS if perks is None else perks
+    return {
+        event: [perks[c] if event in CHARACTER_EVENTS[c] else None for c in characters]
+        for event in PERK_EVENTS
+    }
+
+
+def take_random_card(hand, rng):
+    """Remove and return a random card from ``hand`` (a ``Hand`` or a list)."""
+    if hasattr(hand, "take_random"):
+        return hand.take_random(rng)
+    card = rng.choice(hand)
+    hand.remove(card)
+    return card
+
+
+@register_character("Bart Cassidy", "damaged")
+def bart_cassidy(player, event, deck=None, discard=None, rng=None, **_):
     """Draw a card every time he loses a life point."""
     if event == "damaged" and deck is not None:
-        card = draw_card(deck, discard)
+        card = draw_card(deck, discard, rng)
         if card:
             player["hand"].append(card)
 
 
+@register_character("Calamity Janet", "start")
 def calamity_janet(player, event, **_):
     """BANG! and MISSED! cards are interchangeable."""
     if event == "start":
         player.update({"can_use_missed_as_bang": True, "can_use_bang_as_missed": True})
 
 
-def jesse_jones(player, event, players=None, deck=None, discard=None, **_):
+@register_character("Jesse Jones", "draw_phase")
+def jesse_jones(player, event, players=None, deck=None, discard=None, rng=None, **_):
     """First draw can steal a random card from another player's hand."""
     if event == "draw_phase" and players is not None:
+        rng = rng or random
         others = [p for p in players if p["id"] != player["id"] and p["alive"] and p["hand"]]
         if others:
-            target = random.choice(others)
-            card = random.choice(target["hand"])
-            target["hand"].remove(card)
-            player["hand"].append(card)
+            target = rng.choice(others)
+            player["hand"].append(take_random_card(target["hand"], rng))
             return True  # card taken
     return False
 
 
-def lucky_duke(player, event, deck=None, discard=None, **_):
+@register_character("Lucky Duke", "draw")
+def lucky_duke(player, event, deck=None, discard=None, rng=None, **_):
     """Draw two cards and choose one for each draw."""
     if event == "draw" and deck is not None:
-        card1 = draw_card(deck, discard)
-        card2 = draw_card(deck, discard)
-        chosen = card1 if card2 is None else random.choice([card1, card2])
+        rng = rng or random
+        card1 = draw_card(deck, discard, rng)
+        card2 = draw_card(deck, discard, rng)
+        chosen = card1 if card2 is None else rng.choice([card1, card2])
         extra = card2 if chosen is card1 else card1
         if chosen:
             player["hand"].append(chosen)
@@ -71,12 +146,14 @@ def lucky_duke(player, event, deck=None, discard=None, **_):
     return False
 
 
+@register_character("Paul Regret", "start")
 def paul_regret(player, event, **_):
     """Other players have -1 range when targeting him."""
     if event == "start":
         player["dodge_bonus"] = player.get("dodge_bonus", 0) + 1
 
 
+@register_character("Sid Ketchum", "turn_start")
 def sid_ketchum(player, event, discard=None, **_):
     """May discard two cards at start of turn to regain 1 life."""
     if event == "turn_start" and discard is not None:
@@ -86,34 +163,37 @@ def sid_ketchum(player, event, discard=None, **_):
             player["hp"] += 1
 
 
+@register_character("Slab the Killer", "start")
 def slab_the_killer(player, event, **_):
     """Targets need two MISSED! cards to cancel his BANG!"""
-    # handled in main during attack
-    return None
+    if event == "start":
+        player["misses_needed"] = 2
 
 
-def suzy_lafayette(player, event, deck=None, discard=None, **_):
+@register_character("Suzy Lafayette", "turn_end")
+def suzy_lafayette(player, event, deck=None, discard=None, rng=None, **_):
     """Draw a card if she ends her turn with no cards in hand."""
     if event == "turn_end" and deck is not None and not player["hand"]:
-        card = draw_card(deck, discard)
+        card = draw_card(deck, discard, rng)
         if card:
             player["hand"].append(card)
 
 
+@register_character("Willy the Kid", "start")
 def willy_the_kid(player, event, **_):
     """May play any number of BANG! cards."""
     if event == "start":
         player["unlimited_bang"] = True
 
 
-def el_gringo(player, event, attacker=None, **_):
+@register_character("El Gringo", "damaged_by_player")
+def el_gringo(player, event, attacker=None, rng=None, **_):
     """When hit by a player, steals a random card from the attacker."""
     if event == "damaged_by_player" and attacker and attacker["hand"]:
-        card = random.choice(attacker["hand"])
-        attacker["hand"].remove(card)
-        player["hand"].append(card)
+        player["hand"].append(take_random_card(attacker["hand"], rng or random))
 
 
+@register_character("Pedro Ramirez", "draw_phase")
 def pedro_ramirez(player, event, discard=None, **_):
     """May draw the first card from discard instead of deck."""
     if event == "draw_phase" and discard:
@@ -122,12 +202,14 @@ def pedro_ramirez(player, event, discard=None, **_):
     return False
 
 
-def kit_carlson(player, event, deck=None, **_):
+@register_character("Kit Carlson", "draw_phase")
+def kit_carlson(player, event, deck=None, rng=None, **_):
     """Looks at the top three cards and chooses two."""
     if event == "draw_phase" and deck is not None:
-        cards = [draw_card(deck, []) for _ in range(3)]
+        rng = rng or random
+        cards = [draw_card(deck, [], rng) for _ in range(3)]
         available = [c for c in cards if c]
-        keep = random.sample(available, k=min(2, len(available)))
+        keep = rng.sample(available, k=min(2, len(available)))
         for card in keep:
             player["hand"].append(card)
         for card in cards:
@@ -137,62 +219,182 @@ def kit_carlson(player, event, deck=None, **_):
     return False
 
 
+@register_character("Rose Doolan", "start")
 def rose_doolan(player, event, **_):
     """Has +1 range."""
     if event == "start":
         player["range_bonus"] = player.get("range_bonus", 0) + 1
 
 
-def black_jack(player, event, deck=None, discard=None, **_):
+@register_character("Black Jack", "draw_phase")
+def black_jack(player, event, deck=None, discard=None, rng=None, **_):
     """If lucky, draws an extra card."""
     if event == "draw_phase" and deck is not None:
+        rng = rng or random
         # draw two normal cards first
         for _ in range(2):
-            card = draw_card(deck, discard)
+            card = draw_card(deck, discard, rng)
             if card:
                 player["hand"].append(card)
-        if random.random() < 0.5:
-            card = draw_card(deck, discard)
+        if rng.random() < 0.5:
+            card = draw_card(deck, discard, rng)
             if card:
                 player["hand"].append(card)
         return "skip"
     return False
 
 
-CHARACTER_PERKS = {
-    "Bart Cassidy": bart_cassidy,
-    "Calamity Janet": calamity_janet,
-    "Jesse Jones": jesse_jones,
-    "Lucky Duke": lucky_duke,
-    "Paul Regret": paul_regret,
-    "Sid Ketchum": sid_ketchum,
-    "Slab the Killer": slab_the_killer,
-    "Suzy Lafayette": suzy_lafayette,
-    "Willy the Kid": willy_the_kid,
-    "El Gringo": el_gringo,
-    "Pedro Ramirez": pedro_ramirez,
-    "Kit Carlson": kit_carlson,
-    "Rose Doolan": rose_doolan,
-    "Black Jack": black_jack,
-}
-
-CHARACTER_ABILITY_DESCRIPTIONS = {
-    name: func.__doc__.strip() if func.__doc__ else ""
-    for name, func in CHARACTER_PERKS.items()
-}
+DECK_SIZE = sum(DECK_COUNTS.values())
+
+
+class Deck:
+    """Draw and discard piles sharing one preallocated buffer of card ids.
+
+    The draw pile is ``cards[:top]`` and is drawn from its end, like
+    ``list.pop``. The discard pile (``discards``) grows down from the end of
+    the buffer with its newest card at ``cards[bottom]``. Cards held by the
+    players are in neither pile, so the two regions never overlap. An empty
+    draw pile is refilled with the discards, shuffled in place with the same
+    Fisher-Yates steps as ``random.shuffle``, so seeded games deal exactly
+    as they did with lists. ``reset`` starts a new game in the same buffer.
+
+    ``counts`` maps card names to their number of copies (``DECK_COUNTS``
+    by default).
+    """
+
+    __slots__ = ("counts", "template", "size", "cards", "top", "bottom", "rng", "discards")
+
+    def __init__(self, counts=None):
+        self.counts = dict(DECK_COUNTS if counts is None else counts)
+        self.template = [CARD_IDS[card] for card, count in self.counts.items() for _ in range(count)]
+        self.size = len(self.template)
+        self.cards = self.template[:]
+        self.top = self.size
+        self.bottom = self.size
+        self.rng = random
+        self.discards = DiscardPile(self)
+
+    def reset(self, rng=None):
+        """Gather every card into the draw pile and shuffle it with ``rng``."""
+        self.rng = rng or random
+        self.cards[:] = self.template
+        self.top = self.size
+        self.bottom = self.size
+        self._shuffle(self.size)
+
+    def _shuffle(self, n):
+        cards = self.cards
+        # ``_randbelow`` is what ``random.shuffle`` itself calls; the module
+        # level ``random`` only exposes ``randrange``, which draws the same.
+        randbelow = getattr(self.rng, "_randbelow", None) or self.rng.randrange
+        for i in range(n - 1, 0, -1):
+            j = randbelow(i + 1)
+            cards[i], cards[j] = cards[j], cards[i]
+
+    def __len__(self):
+        return self.top
+
+    def __bool__(self):
+        return self.top > 0
+
+    def __iter__(self):
+        """Cards of the draw pile; the last one is drawn next."""
+        for card_id in self.cards[:self.top]:
+            yield CARD_NAMES[card_id]
+
+    def draw(self, refill=True):
+        """Remove and return the top card, or ``None`` when none is left.
+
+        With ``refill`` an empty draw pile is first replaced by the
+        shuffled discards.
+        """
+        if not self.top:
+            if not refill:
+                return None
+            self._refill()
+            if not self.top:
+                return None
+        self.top -= 1
+        return CARD_NAMES[self.cards[self.top]]
+
+    def _refill(self):
+        cards = self.cards
+        n = self.size - self.bottom
+        # oldest discard first, like ``deck.extend(discard)``
+        cards[:n] = cards[self.bottom:][::-1]
+        self.top = n
+        self.bottom = self.size
+        self._shuffle(n)
+
+    def append(self, card):
+        """Put ``card`` back on top of the draw pile."""
+        self.cards[self.top] = CARD_IDS[card]
+        self.top += 1
+
+
+class DiscardPile:
+    """List-like view of the discard region of a ``Deck``."""
+
+    __slots__ = ("deck",)
+
+    def __init__(self, deck):
+        self.deck = deck
+
+    def __len__(self):
+        return self.deck.size - self.deck.bottom
+
+    def __bool__(self):
+        return self.deck.bottom < self.deck.size
+
+    def __iter__(self):
+        """Discarded cards, oldest first."""
+        deck = self.deck
+        for card_id in reversed(deck.cards[deck.bottom:]):
+            yield CARD_NAMES[card_id]
+
+    def append(self, card):
+        deck = self.deck
+        deck.bottom -= 1
+        deck.cards[deck.bottom] = CARD_IDS[card]
+
+    def pop(self):
+        """Remove and return the newest discard."""
+        deck = self.deck
+        if deck.bottom == deck.size:
+            raise IndexError("pop from empty discard pile")
+        deck.bottom += 1
+        return CARD_NAMES[deck.cards[deck.bottom - 1]]
+
+
+def build_deck(rng=None):
+    """Return a shuffled ``Deck``; its discard pile is ``deck.discards``."""
+    deck = Deck()
+    deck.reset(rng)
+    return deck
 
-CHARACTERS = list(CHARACTER_PERKS.keys())
 
-def build_deck():
-    deck = []
-    for card, count in DECK_COUNTS.items():
-        deck.extend([card] * count)
-    random.shuffle(deck)
-    return deck
+def draw_card(deck, discard, rng=None):
+    """Draw the top card of ``deck``, reshuffling ``discard`` when it is empty.
 
-def draw_card(deck, discard):
+    ``deck`` is a ``Deck`` or a list of card names. For a ``Deck`` the
+    reshuffle only happens when ``discard`` is its own ``discards`` pile
+    (Kit Carlson passes ``[]`` to look at the top cards only) and uses the
+    ``rng`` given to ``Deck.reset``.
+    """
+    if isinstance(deck, Deck):
+        return deck.draw(discard is deck.discards)
     if not deck:
         deck.extend(discard)
         discard.clear()
-        random.shuffle(deck)
+        (rng or random).shuffle(deck)
     return deck.pop() if deck else None
+
+
+def derive_seed(base_seed, *indexes):
+    """Derive an independent 64-bit seed from ``base_seed`` and ``indexes``.
+
+    The derivation is a stable hash, so ``derive_seed(seed, i)`` gives the
+    same value in every process and on every machine.
+    """
+    data = repr((base_seed,) + indexes).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")